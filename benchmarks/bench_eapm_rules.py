@@ -0,0 +1,130 @@
+"""
+Compare eAPM classification throughput of the compiled rule engine against
+the if-chain classifier it replaced.
+
+Run from the repository root:
+    python benchmarks/bench_eapm_rules.py
+"""
+import os
+import random
+import sys
+import time
+from collections import deque
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+
+from utils.eapm_rules import EapmRules
+from utils.key_codes import key_to_code
+from utils.constants import ACTION_CATEGORIES
+
+HOTKEY_GROUPS = {
+    'control': set(['ctrl']),
+    'shift': set(['shift']),
+    'alt': set(['alt']),
+    'numbers': set([str(i) for i in range(10)]),
+    'letters': set([chr(i) for i in range(ord('a'), ord('z')+1)]),
+    'f_keys': set([f'f{i}' for i in range(1, 13)]),
+}
+
+class LegacyClassifier:
+    """The identify_sequence based classifier, kept verbatim for comparison."""
+
+    def __init__(self):
+        self.hotkey_groups = HOTKEY_GROUPS
+        self.action_buffer = deque(maxlen=5)
+
+    def classify(self, action_type, key):
+        self.action_buffer.append((action_type, key))
+        sequence_type = None
+        if len(self.action_buffer) >= 3:
+            sequence_type = self.identify_sequence(list(self.action_buffer)[-3:])
+
+        action_category = None
+        if action_type == 'mouse_click':
+            action_category = 'default'
+        elif action_type == 'keyboard':
+            if self.is_in_hotkey_group(key, 'numbers'):
+                action_category = 'control_group'
+            elif self.is_in_hotkey_group(key, 'letters') or self.is_in_hotkey_group(key, 'f_keys'):
+                action_category = 'ability'
+        return sequence_type, action_category
+
+    def identify_sequence(self, sequence):
+        if ((self.is_in_hotkey_group(sequence[0][1], 'control') or
+             self.is_in_hotkey_group(sequence[0][1], 'shift')) and
+            self.is_in_hotkey_group(sequence[1][1], 'numbers')):
+            return 'control_group'
+
+        if (self.is_in_hotkey_group(sequence[0][1], 'numbers') and
+            sequence[1][0] == 'mouse_click'):
+            return 'control_group'
+
+        if ((self.is_in_hotkey_group(sequence[0][1], 'letters') or
+             self.is_in_hotkey_group(sequence[0][1], 'f_keys')) and
+            sequence[1][0] == 'mouse_click'):
+            return 'build'
+
+        if (self.is_in_hotkey_group(sequence[0][1], 'shift') and
+            sequence[1][0] == 'mouse_click'):
+            return 'move'
+
+        if (self.is_in_hotkey_group(sequence[0][1], 'control') and
+            self.is_in_hotkey_group(sequence[1][1], 'f_keys')):
+            return 'camera'
+
+        return None
+
+    def is_in_hotkey_group(self, key, group):
+        return key in self.hotkey_groups.get(group, set())
+
+def make_events(count, seed=0):
+    rng = random.Random(seed)
+    keys = ['ctrl', 'shift', 'alt', 'space', 'tab'] + [str(i) for i in range(10)] + \
+        [chr(i) for i in range(ord('a'), ord('z')+1)] + [f'f{i}' for i in range(1, 13)]
+    events = []
+    for _ in range(count):
+        if rng.random() < 0.4:
+            events.append(('mouse_click', None))
+        else:
+            events.append(('keyboard', rng.choice(keys)))
+    return events
+
+def bench_legacy(events):
+    classifier = LegacyClassifier()
+    start = time.perf_counter()
+    for action_type, key in events:
+        classifier.classify(action_type, key)
+    return time.perf_counter() - start
+
+def bench_compiled(events):
+    rules = EapmRules(HOTKEY_GROUPS)
+    # Key codes are resolved once in the input thread, outside the hot path
+    coded = [(action_type, key_to_code(key)) for action_type, key in events]
+    start = time.perf_counter()
+    for action_type, key_code in coded:
+        rules.push(rules.class_id(action_type, key_code))
+    return time.perf_counter() - start
+
+def check_equivalence(events):
+    legacy = LegacyClassifier()
+    rules = EapmRules(HOTKEY_GROUPS)
+    for action_type, key in events:
+        expected = legacy.classify(action_type, key)
+        sequence, action = rules.push(rules.class_id(action_type, key_to_code(key)))
+        actual = (ACTION_CATEGORIES[sequence] if sequence else None,
+                  ACTION_CATEGORIES[action] if action else None)
+        if actual != expected:
+            raise AssertionError(f"Mismatch for {action_type} {key!r}: {actual} != {expected}")
+
+def main(count=500_000):
+    events = make_events(count)
+    check_equivalence(events[:50_000])
+
+    legacy = bench_legacy(events)
+    compiled = bench_compiled(events)
+    print(f"events:   {count}")
+    print(f"legacy:   {count / legacy:,.0f} events/s")
+    print(f"compiled: {count / compiled:,.0f} events/s ({legacy / compiled:.1f}x)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,218 @@
+"""
+Benchmarks for the tracker hot paths, driven by synthetic sessions.
+
+For every workload (rate x duration x pattern) this reports:
+  - record_ns_per_event: DataManager.record_actions cost per event
+  - tick_us: latency of each stats call the GUI makes per tick
+  - export_seconds: DataManager.export_data wall time
+  - peak_memory_bytes: tracemalloc peak while ingesting the session
+  - graph_frame_ms: GraphFrame.update_graph on the Agg backend, one second
+    apart so every bar moves
+  - graph_bar_frame_ms: the same within one second, so only the newest bar
+    changes
+
+Results are written as JSON so runs can be diffed against each other.
+
+Run from the repository root:
+    python benchmarks/bench_tracker.py --quick
+    python benchmarks/bench_tracker.py --output bench.json
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+import types
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+
+import numpy as np
+import matplotlib
+matplotlib.use('Agg')
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+from utils.event_store import EventColumns
+from utils.key_codes import key_to_code
+from utils.replay import ReplayDriver
+from utils.data_manager import DataManager
+from utils.constants import ACTION_KINDS, DEFAULT_GRAPH_TIME_RANGE, DEFAULT_MAX_ACTIONS_PER_SECOND
+
+RATES = [60, 300, 600, 1500]  # APM
+DURATIONS = [60, 600, 3600, 36000]  # seconds
+PATTERNS = ['steady', 'bursty']
+QUICK_DURATIONS = [60, 600]
+
+TICK_CALLS = 200
+GRAPH_FRAMES = 20
+BURST_ON = 10  # seconds at BURST_FACTOR x the mean rate ...
+BURST_OFF = 20  # ... followed by this many idle seconds
+BURST_FACTOR = (BURST_ON + BURST_OFF) / BURST_ON
+
+KEYS = ['ctrl', 'shift', 'alt', 'space'] + [str(i) for i in range(10)] + \
+    [chr(i) for i in range(ord('a'), ord('z')+1)] + [f'f{i}' for i in range(1, 13)]
+
+def make_session(rate_apm, duration, pattern, seed=0, start=1_700_000_000.0):
+    """Poisson arrivals at ``rate_apm``, bursty sessions keep the same mean rate."""
+    rng = np.random.default_rng(seed)
+    rate = rate_apm / 60
+    if pattern == 'steady':
+        count = rng.poisson(rate * duration)
+        offsets = np.sort(rng.uniform(0, duration, count))
+    else:
+        periods = np.arange(0, duration, BURST_ON + BURST_OFF)
+        counts = rng.poisson(rate * BURST_FACTOR * BURST_ON, len(periods))
+        offsets = np.sort(np.concatenate([
+            period + rng.uniform(0, BURST_ON, count) for period, count in zip(periods, counts)
+        ]))
+        offsets = offsets[offsets < duration]
+
+    count = len(offsets)
+    mouse = rng.random(count) < 0.4
+    key_codes = np.array([key_to_code(key) for key in KEYS], dtype=np.uint16)
+    keys = np.where(mouse, 0, key_codes[rng.integers(0, len(KEYS), count)]).astype(np.uint16)
+    kinds = np.where(mouse, ACTION_KINDS.index('mouse_click'), ACTION_KINDS.index('keyboard')).astype(np.uint8)
+    return EventColumns(
+        timestamps=start + offsets,
+        weights=np.zeros(count, dtype=np.float32),
+        categories=np.zeros(count, dtype=np.uint8),
+        kinds=kinds,
+        keys=keys,
+    )
+
+def time_calls(func, calls):
+    start = time.perf_counter()
+    for _ in range(calls):
+        func()
+    return (time.perf_counter() - start) / calls
+
+def bench_ingest(session):
+    driver = ReplayDriver(session, speed=None)
+    stats = driver.run()
+    return driver, stats['wall_seconds'] * 1e9 / max(stats['events'], 1)
+
+def bench_memory(session):
+    driver = ReplayDriver(session, speed=None)
+    driver.close()
+    # Only count the DataManager, not the replay's prebuilt event list
+    tracemalloc.start()
+    driver.data_manager = DataManager(clock=driver.clock)
+    driver.run()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    driver.close()
+    return peak
+
+def bench_ticks(data_manager):
+    return {
+        name: time_calls(getattr(data_manager, name), TICK_CALLS) * 1e6
+        for name in ('calculate_current_apm', 'calculate_current_eapm',
+                     'calculate_average_apm', 'calculate_average_eapm')
+    }
+
+def bench_export(data_manager):
+    fd, path = tempfile.mkstemp(suffix='.csv')
+    os.close(fd)
+    try:
+        start = time.perf_counter()
+        data_manager.export_data(path)
+        return time.perf_counter() - start
+    finally:
+        os.remove(path)
+
+def bench_graph(data_manager):
+    from gui.graph_frame import GraphFrame, MatplotlibGraph
+    from utils.metrics import Histogram
+    import matplotlib.pyplot as plt
+
+    settings = types.SimpleNamespace(
+        graph_time_range=DEFAULT_GRAPH_TIME_RANGE,
+        max_actions_per_second=DEFAULT_MAX_ACTIONS_PER_SECOND,
+        graph_update_interval=1000,
+        graph_backend='matplotlib',
+    )
+    tracker = types.SimpleNamespace(data_manager=data_manager, settings_manager=settings)
+    # Build the matplotlib renderer without the Tk widgets and render it on Agg
+    graph = GraphFrame.__new__(GraphFrame)
+    graph.tracker = tracker
+    graph.frame_latency = Histogram('bench_graph_frame_seconds', '')
+    graph.renderer = MatplotlibGraph(None, settings)
+    FigureCanvasAgg(graph.renderer.figure)
+    try:
+        graph.update_graph()  # Warm up fonts and caches
+        clock = data_manager.clock
+        start = time.perf_counter()
+        for frame in range(GRAPH_FRAMES):
+            clock.set(clock.time() + 1)  # Move on a second per frame
+            graph.update_graph()
+        shift_ms = (time.perf_counter() - start) / GRAPH_FRAMES * 1e3
+
+        start = time.perf_counter()
+        for frame in range(GRAPH_FRAMES):
+            data_manager.record_action('keyboard', 'a', clock.time())
+            graph.update_graph()
+        bar_ms = (time.perf_counter() - start) / GRAPH_FRAMES * 1e3
+        return shift_ms, bar_ms
+    finally:
+        plt.close(graph.renderer.figure)
+
+def run_workload(rate, duration, pattern, skip_export=False, skip_graph=False):
+    session = make_session(rate, duration, pattern)
+    driver, ns_per_event = bench_ingest(session)
+    data_manager = driver.data_manager
+    try:
+        result = {
+            'workload': {'rate_apm': rate, 'duration_seconds': duration, 'pattern': pattern,
+                         'events': len(session.timestamps)},
+            'record_ns_per_event': ns_per_event,
+            'tick_us': bench_ticks(data_manager),
+            'export_seconds': None if skip_export else bench_export(data_manager),
+        }
+        # Last, as it moves the clock on and records a few more actions
+        result['graph_frame_ms'], result['graph_bar_frame_ms'] = \
+            (None, None) if skip_graph else bench_graph(data_manager)
+    finally:
+        driver.close()
+    result['peak_memory_bytes'] = bench_memory(session)
+    return result
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the APM Tracker hot paths")
+    parser.add_argument('--rates', type=int, nargs='+', default=RATES, help="APM rates to simulate")
+    parser.add_argument('--durations', type=int, nargs='+', default=None, help="session lengths in seconds")
+    parser.add_argument('--patterns', nargs='+', default=PATTERNS, choices=PATTERNS)
+    parser.add_argument('--quick', action='store_true', help="only run sessions up to 10 minutes")
+    parser.add_argument('--skip-export', action='store_true')
+    parser.add_argument('--skip-graph', action='store_true')
+    parser.add_argument('--output', help="write JSON results to this file instead of stdout")
+    args = parser.parse_args()
+
+    durations = args.durations or (QUICK_DURATIONS if args.quick else DURATIONS)
+    results = []
+    for pattern in args.patterns:
+        for duration in durations:
+            for rate in args.rates:
+                print(f"{pattern} {rate} APM for {duration}s...", file=sys.stderr)
+                results.append(run_workload(rate, duration, pattern, args.skip_export, args.skip_graph))
+
+    report = {
+        'meta': {
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'matplotlib': matplotlib.__version__,
+            'platform': platform.platform(),
+        },
+        'results': results,
+    }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output)
+    else:
+        print(output)
+
+if __name__ == "__main__":
+    main()
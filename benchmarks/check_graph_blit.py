@@ -0,0 +1,60 @@
+"""
+Check that the incrementally blitted live graph matches a full render pixel
+for pixel. Random bars change for a number of frames, with a full shift
+every tenth frame, at every graph time range; after each frame the blitted
+buffer is compared with a fresh full draw of the same figure on Agg.
+
+Run from the repository root:
+    python benchmarks/check_graph_blit.py
+"""
+import os
+import sys
+import types
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+
+import numpy as np
+import matplotlib
+matplotlib.use('Agg')
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+import matplotlib.pyplot as plt
+
+from gui.graph_frame import MatplotlibGraph
+from utils.constants import GRAPH_TIME_RANGE_OPTIONS
+
+FRAMES = 40
+
+def check_time_range(time_range, rng):
+    settings = types.SimpleNamespace(graph_time_range=time_range, max_actions_per_second=100)
+    graph = MatplotlibGraph(None, settings)
+    canvas = FigureCanvasAgg(graph.figure)
+    apm = np.zeros(time_range)
+    eapm = np.zeros(time_range)
+    try:
+        graph.update(apm.copy(), eapm.copy())
+        for frame in range(FRAMES):
+            slots = np.arange(time_range) if frame % 10 == 0 else rng.integers(0, time_range, rng.integers(1, 4))
+            apm[slots] = rng.integers(0, 9, len(slots))
+            eapm[slots] = np.minimum(apm[slots], rng.integers(0, 9, len(slots)))
+            apm[0] = 8  # Keeps the y-limit steady, so every frame after the first is blitted
+            graph.update(apm.copy(), eapm.copy())
+
+            blitted = np.asarray(canvas.buffer_rgba()).copy()
+            canvas.draw()
+            full = np.asarray(canvas.buffer_rgba())
+            if not np.array_equal(blitted, full):
+                pixels = np.argwhere((blitted != full).any(axis=2))
+                raise AssertionError(f"{time_range}s graph, frame {frame}: {len(pixels)} pixels differ "
+                                     f"from a full render, first at row/column {pixels[0].tolist()}")
+    finally:
+        plt.close(graph.figure)
+    return graph.dense
+
+def main():
+    rng = np.random.default_rng(1)
+    for time_range in GRAPH_TIME_RANGE_OPTIONS:
+        dense = check_time_range(time_range, rng)
+        print(f"{time_range:>4}s: {FRAMES} frames match a full render{' (dense slots)' if dense else ''}")
+
+if __name__ == "__main__":
+    main()
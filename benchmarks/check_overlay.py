@@ -0,0 +1,95 @@
+"""
+Check the overlay server against a local asyncio client: the /stats JSON,
+the WebSocket handshake, a full first message followed by a delta with only
+the changed fields, and a clean close handshake.
+
+Run from the repository root:
+    python benchmarks/check_overlay.py
+"""
+import asyncio
+import base64
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+
+from utils.overlay_server import OverlayServer, read_frame, websocket_accept, OPCODE_TEXT, OPCODE_CLOSE
+
+PUSH_RATE = 20
+
+class Stats:
+    """Snapshot source whose values the check changes between pushes."""
+
+    def __init__(self):
+        self.values = {'current_apm': 120, 'current_eapm': 80, 'peak_apm': 150}
+
+    def snapshot(self):
+        return dict(self.values)
+
+async def http_get(port, path):
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    writer.write(f"GET {path} HTTP/1.1\r\nHost: localhost\r\n\r\n".encode())
+    response = await reader.read()
+    writer.close()
+    head, body = response.split(b'\r\n\r\n', 1)
+    return head.split(b'\r\n', 1)[0].decode(), body
+
+async def open_websocket(port):
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    key = base64.b64encode(os.urandom(16)).decode()
+    writer.write(
+        "GET /ws HTTP/1.1\r\nHost: localhost\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n"
+        f"Sec-WebSocket-Key: {key}\r\nSec-WebSocket-Version: 13\r\n\r\n".encode())
+    head = await reader.readuntil(b'\r\n\r\n')
+    if not head.startswith(b'HTTP/1.1 101') or websocket_accept(key).encode() not in head:
+        raise AssertionError(f"Bad WebSocket handshake: {head!r}")
+    return reader, writer
+
+async def read_message(reader):
+    opcode, payload = await asyncio.wait_for(read_frame(reader), 2)
+    if opcode != OPCODE_TEXT:
+        raise AssertionError(f"Expected a text frame, got opcode {opcode}")
+    return json.loads(payload)
+
+async def close_websocket(reader, writer):
+    # Client frames must be masked
+    mask = os.urandom(4)
+    payload = (1000).to_bytes(2, 'big')
+    writer.write(bytes([0x80 | OPCODE_CLOSE, 0x80 | len(payload)]) + mask +
+                 bytes(b ^ mask[i % 4] for i, b in enumerate(payload)))
+    # Updates already on their way arrive before the server's close reply
+    opcode = OPCODE_TEXT
+    while opcode == OPCODE_TEXT:
+        opcode, _ = await asyncio.wait_for(read_frame(reader), 2)
+    writer.close()
+    if opcode != OPCODE_CLOSE:
+        raise AssertionError(f"Expected a close frame back, got opcode {opcode}")
+
+async def check(server, stats):
+    status, body = await http_get(server.port, '/stats')
+    if status != 'HTTP/1.1 200 OK' or json.loads(body) != stats.values:
+        raise AssertionError(f"/stats returned {status} {body!r}")
+
+    reader, writer = await open_websocket(server.port)
+    first = await read_message(reader)
+    if first != stats.values:
+        raise AssertionError(f"First message should be the full snapshot: {first}")
+    stats.values['current_apm'] = 125
+    delta = await read_message(reader)
+    if delta != {'current_apm': 125}:
+        raise AssertionError(f"Second message should only hold the changed field: {delta}")
+    await close_websocket(reader, writer)
+    print("stats, handshake, snapshot, delta and close: ok")
+
+def main():
+    stats = Stats()
+    server = OverlayServer(stats.snapshot, port=0, push_rate=PUSH_RATE)
+    server.start()
+    try:
+        asyncio.run(check(server, stats))
+    finally:
+        server.stop()
+
+if __name__ == "__main__":
+    main()
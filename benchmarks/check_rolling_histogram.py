@@ -0,0 +1,70 @@
+"""
+Check that DataManager.histogram, kept up to date by RollingHistogram,
+matches a bincount over the raw recorded actions. A synthetic session
+moves the clock by irregular steps (sub-second, whole seconds, jumps past
+the whole range and small steps back) and records some actions late; after
+every frame the counts and eAPM weights of each graph time range are
+compared with ones computed from scratch.
+
+Actions are recorded at most ROLLING_HISTOGRAM_REFRESH_SECONDS late, the
+lateness the rolling arrays re-read on every update.
+
+Run from the repository root:
+    python benchmarks/check_rolling_histogram.py
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+
+import numpy as np
+
+from utils.clock import ManualClock
+from utils.data_manager import DataManager
+from utils.constants import GRAPH_TIME_RANGE_OPTIONS, ROLLING_HISTOGRAM_REFRESH_SECONDS
+
+FRAMES = 3000
+KEYS = ['a', '1', 'ctrl', 's', 'f1']
+
+def bincount_histogram(data_manager, now, seconds):
+    """Counts and weights per second, newest first, straight from the raw actions."""
+    with data_manager.lock:
+        columns = data_manager.store.select()
+    end = int(now) + 1
+    second = np.floor(columns.timestamps).astype(np.int64)
+    selected = (second >= end - seconds) & (second < end)
+    age = end - 1 - second[selected]
+    return (np.bincount(age, minlength=seconds),
+            np.bincount(age, weights=columns.weights[selected], minlength=seconds))
+
+def main():
+    rng = np.random.default_rng(3)
+    clock = ManualClock(1_700_000_000.0)
+    data_manager = DataManager(clock)
+    try:
+        for frame in range(FRAMES):
+            step = rng.choice([0.1, 0.3, 1.0, 2.5, 400.0, -5.0], p=[.3, .3, .25, .1, .03, .02])
+            clock.set(clock.time() + step)
+            now = clock.time()
+            for _ in range(rng.poisson(4)):
+                late = rng.random() < 0.1
+                lateness = rng.uniform(0, ROLLING_HISTOGRAM_REFRESH_SECONDS) if late else rng.uniform(0, 0.1)
+                data_manager.record_action(str(rng.choice(['keyboard', 'mouse_click'])), str(rng.choice(KEYS)),
+                                           now - lateness)
+            for seconds in GRAPH_TIME_RANGE_OPTIONS:
+                counts, weights = data_manager.histogram(now, seconds)
+                expected_counts, expected_weights = bincount_histogram(data_manager, now, seconds)
+                if not np.array_equal(counts, expected_counts):
+                    raise AssertionError(f"Frame {frame}, {seconds}s: counts differ from a bincount of the raw "
+                                         f"actions at {np.flatnonzero(counts != expected_counts).tolist()}")
+                # Rollups sum weights in float32
+                if not np.allclose(weights, expected_weights, atol=1e-3):
+                    raise AssertionError(f"Frame {frame}, {seconds}s: weights differ from a bincount of the raw "
+                                         f"actions at {np.flatnonzero(~np.isclose(weights, expected_weights, atol=1e-3)).tolist()}")
+        print(f"{FRAMES} frames x {len(GRAPH_TIME_RANGE_OPTIONS)} time ranges match a bincount of "
+              f"{data_manager.total_actions} raw actions")
+    finally:
+        data_manager.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""
+Check that a steady stream of actions reads the same rate in every trailing
+APM window. Actions arrive evenly at each rate for longer than the longest
+window; after that, every window is read after each action, so at every
+point within a second the stream reaches, and each must report the
+stream's rate.
+
+Run from the repository root:
+    python benchmarks/check_window_apm.py
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+
+from utils.clock import ManualClock
+from utils.data_manager import DataManager
+from utils.constants import DEFAULT_APM_WINDOWS
+
+RATES = [60, 300, 600, 1200]  # actions per minute
+START = 1_700_000_000.0
+KEYS = ['a', 's', 'd', 'f']
+
+def check_rate(rate, windows):
+    clock = ManualClock(START)
+    data_manager = DataManager(clock)
+    try:
+        interval = 60 / rate
+        warm_up = int((max(windows) + 1) / interval)
+        for i in range(warm_up + int(2 / interval)):
+            clock.set(START + i * interval)
+            data_manager.record_action('keyboard', KEYS[i % len(KEYS)], clock.time())
+            if i < warm_up:
+                continue
+            # Checked as the stream arrives, at every point it reaches within a second
+            for seconds, (apm, _) in zip(windows, data_manager.calculate_window_apm(windows)):
+                if apm != rate:
+                    raise AssertionError(f"{rate} APM stream read {apm} in the {seconds}s window "
+                                         f"at {clock.time() - int(clock.time()):.2f}s into a second")
+    finally:
+        data_manager.close()
+
+def main():
+    windows = list(DEFAULT_APM_WINDOWS)
+    for rate in RATES:
+        check_rate(rate, windows)
+        print(f"{rate:>5} APM: every window reads {rate} ({', '.join(f'{w}s' for w in windows)})")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+import threading
+import logging
+import traceback
+from utils.data_manager import DataManager
+from utils.settings_manager import SettingsManager
+from utils.clock import SystemClock
+from utils.session_catalog import SessionCatalog
+from utils.constants import SESSION_DB_FILE
+
+class BaseTracker:
+    """
+    What the GUI and headless trackers share: the managers, the input
+    thread and the optional background services, which both start and
+    stop the same way. Subclasses create input_manager once anything it
+    needs from them exists.
+    """
+
+    def __init__(self):
+        self.running = True
+        self.clock = SystemClock()
+        self.data_manager = DataManager(self.clock)
+        self.settings_manager = SettingsManager()
+        self.input_manager = None
+        self.input_thread = None
+        self.session_catalog = None
+        self.overlay_server = None
+        self.metrics_server = None
+
+    def start_input(self):
+        self.input_thread = threading.Thread(target=self.run_input, daemon=True)
+        self.input_thread.start()
+
+    def run_input(self):
+        try:
+            self.input_manager.input_loop()
+        except Exception as e:
+            # pynput cannot hook input without an X display or uinput access
+            logging.error(f"Input hooks failed: {str(e)}")
+            logging.debug(traceback.format_exc())
+
+    def start_services(self):
+        self.start_session_catalog()
+        self.start_overlay_server()
+        self.start_shared_stats()
+        self.start_metrics_server()
+        self.data_manager.start_compaction()
+
+    def start_session_catalog(self):
+        if not self.settings_manager.session_history:
+            return
+        try:
+            self.session_catalog = SessionCatalog(SESSION_DB_FILE, self.settings_manager.session_history_keys)
+            self.data_manager.start_catalog(self.session_catalog, self.settings_manager.target_program)
+        except Exception as e:
+            logging.error(f"Error opening session catalog: {str(e)}")
+            self.session_catalog = None
+
+    def start_overlay_server(self):
+        settings = self.settings_manager
+        if not settings.overlay_server:
+            return
+        try:
+            # asyncio is only loaded when the overlay is enabled
+            from utils.overlay_server import OverlayServer
+            self.overlay_server = OverlayServer(self.get_stats_snapshot, port=settings.overlay_port,
+                                                push_rate=settings.overlay_push_rate)
+            self.overlay_server.start()
+        except Exception as e:
+            logging.error(f"Error starting overlay server: {str(e)}")
+            self.overlay_server = None
+
+    def start_shared_stats(self):
+        if not self.settings_manager.shared_stats:
+            return
+        try:
+            self.data_manager.start_shared_stats()
+        except Exception as e:
+            logging.error(f"Error starting shared stats: {str(e)}")
+
+    def start_metrics_server(self):
+        if not self.settings_manager.metrics_server:
+            return
+        try:
+            # http.server is only loaded when metrics are enabled
+            from utils.metrics_server import MetricsServer
+            self.data_manager.enable_metrics()
+            if self.input_manager:
+                self.input_manager.enable_metrics()
+            self.metrics_server = MetricsServer(port=self.settings_manager.metrics_port)
+            self.metrics_server.start()
+        except Exception as e:
+            logging.error(f"Error starting metrics server: {str(e)}")
+            self.metrics_server = None
+
+    def stop_services(self):
+        """Stop input and every service, then save the session."""
+        self.running = False
+        if self.input_thread:
+            self.input_manager.stop()  # Ensure input_loop exits
+            self.input_thread.join()
+        if self.metrics_server:
+            self.metrics_server.stop()
+        if self.overlay_server:
+            self.overlay_server.stop()
+        self.data_manager.close(self.settings_manager.target_program)
+        if self.session_catalog:
+            self.session_catalog.close()
+
+    def get_stats_snapshot(self):
+        average_window = self.settings_manager.average_window
+        since = self.data_manager.current_time() - average_window * 60 if average_window else None
+        return self.data_manager.get_stats_snapshot(self.settings_manager.apm_windows, since)
+
+    def on_action(self, action_type, key=None, timestamp=None):
+        self.data_manager.record_action(action_type, key, timestamp)
+
+    def on_actions(self, events):
+        self.data_manager.record_actions(events)
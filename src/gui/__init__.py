@@ -1,13 +1,25 @@
-from .gui_manager import GUIManager
-from .main_frame import MainFrame
-from .graph_frame import GraphFrame
-from .settings_frame import SettingsFrame
-from .mini_window import MiniWindow
+import importlib
+
+# Frames are imported on first attribute access, see utils/__init__.py
+_LAZY_EXPORTS = {
+    'GUIManager': '.gui_manager',
+    'MainFrame': '.main_frame',
+    'GraphFrame': '.graph_frame',
+    'SettingsFrame': '.settings_frame',
+    'StatsFrame': '.stats_frame',
+    'MiniWindow': '.mini_window',
+}
 
 __all__ = [
     'GUIManager',
     'MainFrame',
     'GraphFrame',
     'SettingsFrame',
+    'StatsFrame',
     'MiniWindow'
 ]
+
+def __getattr__(name):
+    if name in _LAZY_EXPORTS:
+        return getattr(importlib.import_module(_LAZY_EXPORTS[name], __name__), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
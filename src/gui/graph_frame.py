@@ -1,168 +1,397 @@
 import tkinter as tk
 from tkinter import ttk
+import logging
+import math
+import time
 import numpy as np
-import matplotlib
-matplotlib.use('Agg')
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-import matplotlib.animation as animation
 import datetime
 from utils.constants import (
     GRAPH_APM_COLOR, GRAPH_EAPM_COLOR, GRAPH_ALPHA, GRAPH_DPI, GRAPH_FIGSIZE,
-    FONT_FILENAME, FONT_NAME, FONT_PATH
+    FONT_FILENAME, FONT_NAME, FONT_PATH, FRAME_LATENCY_BUCKETS,
+    GRAPH_YLIM_HEADROOM, GRAPH_YLIM_SHRINK, GRAPH_BLIT_MIN_SLOT_PIXELS,
+    GRAPH_CANVAS_APM_FILL, GRAPH_CANVAS_EAPM_FILL, GRAPH_CANVAS_OVERLAP_FILL, GRAPH_CANVAS_BG,
+    GRAPH_CANVAS_MARGINS, DEFAULT_GRAPH_BACKEND
 )
-
-class GraphFrame:
-    def __init__(self, parent, tracker):
-        self.parent = parent
-        self.tracker = tracker
-        self.frame = ttk.Frame(parent)
-        self.animation_running = False
-        self.setup_graph_frame()
-
-
-    def setup_graph_frame(self):
-        plt.rcParams['font.family'] = "monospace" 
+from utils.metrics import REGISTRY
+
+def pyplot():
+    # matplotlib takes a large share of startup time, so it is only
+    # imported once a graph is first shown or exported
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    return plt
+
+def rescaled_top(y_top, max_value, limit):
+    """
+    A new y-limit when the tallest bar no longer fits or has dropped well
+    below the current one, otherwise None so the axes stay as they are.
+    """
+    if (max_value > y_top and y_top < limit) or max_value < y_top * GRAPH_YLIM_SHRINK:
+        new_top = min(max(max_value * GRAPH_YLIM_HEADROOM, 1), limit)
+        if new_top != y_top:
+            return new_top
+    return None
+
+def integer_ticks(top, max_ticks=5):
+    """Whole-number ticks from 0 to ``top`` with a 1, 2 or 5 step, like MaxNLocator(integer=True)."""
+    magnitude = 10 ** max(int(math.log10(max(top, 1) / max_ticks)), 0)
+    for factor in (1, 2, 5, 10):
+        step = factor * magnitude
+        if top / step <= max_ticks:
+            break
+    return list(range(0, int(top) + 1, step))
+
+class MatplotlibGraph:
+    """
+    Live bars on a matplotlib figure. The axes, ticks, labels and legend
+    frame are rendered once into a cached background; each frame only
+    restores and redraws the bar slots whose heights changed and blits that
+    region. The whole figure is re-rendered only when the y-limit has to
+    move, which uses hysteresis so it does not happen on every small change.
+    """
+
+    def __init__(self, master, settings):
+        self.settings = settings
+        self.background = None
+        self.create_figure()
+        self.tk_canvas = None
+        if master is not None:
+            from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+            self.tk_canvas = FigureCanvasTkAgg(self.figure, master=master)
+            self.tk_canvas.get_tk_widget().pack(side=tk.TOP, fill=tk.BOTH, expand=1)
+            self.tk_canvas.draw()
+
+    def create_figure(self):
+        # Kept free of Tk so the graph can also be rendered headless on Agg
+        plt = pyplot()
+        plt.rcParams['font.family'] = "monospace"
         plt.rcParams['font.size'] = 10  # Base font size
 
         self.figure, self.ax = plt.subplots(figsize=GRAPH_FIGSIZE, dpi=GRAPH_DPI)
-        self.canvas = FigureCanvasTkAgg(self.figure, master=self.frame)
-        self.canvas.draw()
-        self.canvas.get_tk_widget().pack(side=tk.TOP, fill=tk.BOTH, expand=1)
+        # Every full render, including resizes, recaptures the background
+        self.figure.canvas.mpl_connect('draw_event', self.on_draw)
+        self.setup_axes()
 
-        self.apm_data = np.zeros(self.tracker.settings_manager.graph_time_range)
-        self.eapm_data = np.zeros(self.tracker.settings_manager.graph_time_range)
+    def setup_axes(self):
+        from matplotlib.ticker import MaxNLocator
+        time_range = self.settings.graph_time_range
 
-        x = range(self.tracker.settings_manager.graph_time_range)
+        self.ax.clear()
+        self.apm_data = np.zeros(time_range)
+        self.eapm_data = np.zeros(time_range)
+
+        x = range(time_range)
         self.apm_bars = self.ax.bar(x, self.apm_data, color=GRAPH_APM_COLOR, alpha=GRAPH_ALPHA, label='APM')
         self.eapm_bars = self.ax.bar(x, self.eapm_data, color=GRAPH_EAPM_COLOR, alpha=GRAPH_ALPHA, label='eAPM')
 
-        self.ax.legend(loc='upper left', fontsize=8)
+        self.legend = self.ax.legend(loc='upper left', fontsize=8)
         self.ax.set_title('APM and eAPM over time', fontsize=12, fontweight='bold')
         self.ax.set_xlabel('Time (seconds ago)', fontsize=10)
         self.ax.set_ylabel('Number of Actions', fontsize=10)
-        
-        self.ax.set_xlim(self.tracker.settings_manager.graph_time_range - 1, 0)
-        self.ax.set_ylim(0, self.tracker.settings_manager.max_actions_per_second)
-        self.ax.set_xticks([0, self.tracker.settings_manager.graph_time_range // 4, self.tracker.settings_manager.graph_time_range // 2, 3 * self.tracker.settings_manager.graph_time_range // 4, self.tracker.settings_manager.graph_time_range - 1])
-        self.ax.set_xticklabels(['0', str(self.tracker.settings_manager.graph_time_range // 4), str(self.tracker.settings_manager.graph_time_range // 2), str(3 * self.tracker.settings_manager.graph_time_range // 4), str(self.tracker.settings_manager.graph_time_range)], fontsize=8)
-        self.ax.yaxis.set_major_locator(plt.MaxNLocator(integer=True, nbins=5))
-
-        self.ani = animation.FuncAnimation(
-            self.figure, 
-            self.update_graph, 
-            interval=self.tracker.settings_manager.graph_update_interval, 
-            blit=True, 
-            save_count=100
-        )
-        self.ani.event_source.stop()  # Start with animation paused
+
+        self.ax.set_xlim(time_range - 1, 0)
+        self.y_top = self.settings.max_actions_per_second
+        self.ax.set_ylim(0, self.y_top)
+        ticks = [0, time_range // 4, time_range // 2, 3 * time_range // 4, time_range - 1]
+        self.ax.set_xticks(ticks)
+        self.ax.set_xticklabels([str(t) for t in ticks[:-1]] + [str(time_range)], fontsize=8)
+        self.ax.yaxis.set_major_locator(MaxNLocator(integer=True, nbins=5))
+
+        # The bars and the legend drawn over them are left out of full
+        # renders and painted by on_draw and blit_slots instead. The legend
+        # handles are copied above, before the bars are marked animated.
+        for bar in list(self.apm_bars) + list(self.eapm_bars):
+            bar.set_animated(True)
+        self.legend.set_animated(True)
+        self.background = None
+
+    def on_draw(self, event):
+        canvas = self.figure.canvas
+        self.background = canvas.copy_from_bbox(self.figure.bbox)
+        self.measure_slots()
+        for bar in list(self.apm_bars) + list(self.eapm_bars):
+            self.ax.draw_artist(bar)
+        self.ax.draw_artist(self.legend)
+
+    def measure_slots(self):
+        """Pixel extents of each bar slot and of the legend, for partial redraws."""
+        count = len(self.apm_data)
+        axes = self.ax.bbox
+        centers = np.arange(count)
+        edges = self.ax.transData.transform(
+            np.column_stack([np.concatenate([centers - 0.5, centers + 0.5]), np.zeros(2 * count)]))[:, 0]
+        # Neighbouring slots share a rounded boundary, so the slots tile the
+        # axes without overlapping and each snapped bar falls inside its own
+        edges = np.round(np.clip(edges, axes.x0, axes.x1)).astype(int)
+        self.slot_left = np.minimum(edges[:count], edges[count:])
+        self.slot_right = np.maximum(edges[:count], edges[count:])  # Exclusive
+        self.axes_bottom = int(np.floor(axes.y0))
+        self.axes_top = int(np.ceil(axes.y1))
+        # Slots narrower than a few pixels share edge pixels with their neighbours
+        self.dense = count and (axes.width / count) < GRAPH_BLIT_MIN_SLOT_PIXELS
+        legend = self.legend.get_window_extent()
+        self.legend_slots = np.flatnonzero((self.slot_right > legend.x0) & (self.slot_left < legend.x1))
+
+    def update(self, new_apm_data, new_eapm_data):
+        changed = np.flatnonzero((new_apm_data != self.apm_data) | (new_eapm_data != self.eapm_data))
+        for i in changed:
+            self.apm_bars[i].set_height(new_apm_data[i])
+            self.eapm_bars[i].set_height(new_eapm_data[i])
+        self.apm_data = new_apm_data
+        self.eapm_data = new_eapm_data
+
+        y_top = rescaled_top(self.y_top, max(np.max(new_apm_data), np.max(new_eapm_data)),
+                             self.settings.max_actions_per_second)
+        if y_top is not None or self.background is None:
+            if y_top is not None:
+                self.y_top = y_top
+                self.ax.set_ylim(0, y_top)
+            self.figure.canvas.draw()  # on_draw paints the bars onto the new background
+        elif len(changed):
+            self.blit_slots(changed)
+
+    def blit_slots(self, slots):
+        canvas = self.figure.canvas
+        if self.dense:
+            slots = np.arange(len(self.apm_data))
+        redraw_legend = bool(np.isin(slots, self.legend_slots).any())
+        if redraw_legend:
+            # The legend is drawn over these slots, redraw everything under it too
+            slots = np.union1d(slots, self.legend_slots)
+        left = self.slot_left[slots].min()
+        right = self.slot_right[slots].max()
+
+        # Regions are inclusive, in the background's top-down pixel
+        # coordinates. The background covers the whole figure, so it is
+        # restored in place.
+        height = int(round(self.figure.bbox.height))
+        top, bottom = height - self.axes_top, height - self.axes_bottom - 1
+        if self.dense:
+            canvas.restore_region(self.background, bbox=(left, top, right - 1, bottom), xy=(0, 0))
+        else:
+            for i in slots:
+                canvas.restore_region(self.background, bbox=(self.slot_left[i], top, self.slot_right[i] - 1, bottom),
+                                      xy=(0, 0))
+        for i in slots:
+            self.ax.draw_artist(self.apm_bars[i])
+            self.ax.draw_artist(self.eapm_bars[i])
+        if redraw_legend:
+            self.ax.draw_artist(self.legend)
+
+        from matplotlib.transforms import Bbox
+        canvas.blit(Bbox.from_extents(left, self.axes_bottom, right, self.axes_top))
+
+    def update_settings(self):
+        self.setup_axes()
+        self.figure.canvas.draw()
+
+    def destroy(self):
+        if self.tk_canvas:
+            self.tk_canvas.get_tk_widget().destroy()
+        pyplot().close(self.figure)
+
+class CanvasGraph:
+    """
+    Live bars drawn straight onto a tk.Canvas, without matplotlib. Every
+    slot has three rectangles created up front, for the APM bar, the eAPM
+    bar and the part where they overlap, coloured the way the matplotlib
+    graph blends its two translucent bars. A frame only moves the
+    rectangles of the slots that changed with ``coords``; the axes and
+    labels are only redrawn on a resize or when the y-limit moves.
+    """
+
+    def __init__(self, master, settings):
+        self.settings = settings
+        self.canvas = tk.Canvas(master, background=GRAPH_CANVAS_BG, highlightthickness=0)
+        self.canvas.pack(side=tk.TOP, fill=tk.BOTH, expand=1)
+        self.width = max(self.canvas.winfo_reqwidth(), 1)
+        self.height = max(self.canvas.winfo_reqheight(), 1)
+        self.canvas.bind('<Configure>', self.on_resize)
+        self.setup_items()
+
+    def setup_items(self):
+        canvas = self.canvas
+        canvas.delete('all')
+        count = self.settings.graph_time_range
+        self.apm_data = np.zeros(count)
+        self.eapm_data = np.zeros(count)
+        self.y_top = self.settings.max_actions_per_second
+
+        canvas.create_rectangle(0, 0, 0, 0, outline='black', tags='frame')
+        canvas.create_text(0, 0, text='APM and eAPM over time', font=(FONT_NAME, 12, 'bold'), anchor='n', tags='title')
+        canvas.create_text(0, 0, text='Time (seconds ago)', font=(FONT_NAME, 10), anchor='s', tags='xlabel')
+        canvas.create_text(0, 0, text='Number of Actions', font=(FONT_NAME, 10), angle=90, anchor='w', tags='ylabel')
+        self.apm_bars = [canvas.create_rectangle(0, 0, 0, 0, fill=GRAPH_CANVAS_APM_FILL, width=0) for _ in range(count)]
+        self.eapm_bars = [canvas.create_rectangle(0, 0, 0, 0, fill=GRAPH_CANVAS_EAPM_FILL, width=0) for _ in range(count)]
+        self.overlap_bars = [canvas.create_rectangle(0, 0, 0, 0, fill=GRAPH_CANVAS_OVERLAP_FILL, width=0)
+                             for _ in range(count)]
+        for i, (label, fill) in enumerate([('APM', GRAPH_CANVAS_APM_FILL), ('eAPM', GRAPH_CANVAS_EAPM_FILL)]):
+            canvas.create_rectangle(0, 0, 0, 0, fill=fill, width=0, tags=('legend', f'legend_swatch{i}'))
+            canvas.create_text(0, 0, text=label, font=(FONT_NAME, 8), anchor='w', tags=('legend', f'legend_text{i}'))
+        self.layout()
+
+    def on_resize(self, event):
+        if (event.width, event.height) != (self.width, self.height):
+            self.width, self.height = event.width, event.height
+            self.layout()
+
+    def layout(self):
+        """Place the axes, labels and every bar for the current size and y-limit."""
+        canvas = self.canvas
+        left, top, right, bottom = GRAPH_CANVAS_MARGINS
+        self.x0, self.y0 = left, top
+        self.x1, self.y1 = max(self.width - right, left + 1), max(self.height - bottom, top + 1)
+        count = len(self.apm_data)
+        self.slot_width = (self.x1 - self.x0) / count
+
+        canvas.coords('frame', self.x0, self.y0, self.x1, self.y1)
+        canvas.coords('title', (self.x0 + self.x1) / 2, 4)
+        canvas.coords('xlabel', (self.x0 + self.x1) / 2, self.height - 2)
+        canvas.coords('ylabel', 12, (self.y0 + self.y1) / 2)
+
+        canvas.delete('xtick')
+        for seconds in [0, count // 4, count // 2, 3 * count // 4, count]:
+            x = self.x1 - seconds * self.slot_width
+            canvas.create_line(x, self.y1, x, self.y1 + 4, tags='xtick')
+            canvas.create_text(x, self.y1 + 6, text=str(seconds), font=(FONT_NAME, 8), anchor='n', tags='xtick')
+
+        for i in range(2):
+            y = self.y0 + 8 + i * 14
+            canvas.coords(f'legend_swatch{i}', self.x0 + 8, y, self.x0 + 24, y + 8)
+            canvas.coords(f'legend_text{i}', self.x0 + 30, y + 4)
+
+        self.layout_y_axis()
+        for i in range(count):
+            self.place_bar(i)
+        canvas.tag_raise('legend')
+
+    def layout_y_axis(self):
+        canvas = self.canvas
+        canvas.delete('ytick')
+        for value in integer_ticks(self.y_top):
+            y = self.y_for(value)
+            canvas.create_line(self.x0 - 4, y, self.x0, y, tags='ytick')
+            canvas.create_text(self.x0 - 6, y, text=str(value), font=(FONT_NAME, 8), anchor='e', tags='ytick')
+
+    def y_for(self, value):
+        return self.y1 - min(value, self.y_top) / self.y_top * (self.y1 - self.y0)
+
+    def place_bar(self, i):
+        right = self.x1 - i * self.slot_width
+        inset = self.slot_width * 0.1  # Bars fill 80% of their slot, like matplotlib's default width
+        x0, x1 = right - self.slot_width + inset, right - inset
+        apm, eapm = self.apm_data[i], self.eapm_data[i]
+        self.canvas.coords(self.apm_bars[i], x0, self.y_for(apm), x1, self.y1)
+        self.canvas.coords(self.eapm_bars[i], x0, self.y_for(eapm), x1, self.y1)
+        self.canvas.coords(self.overlap_bars[i], x0, self.y_for(min(apm, eapm)), x1, self.y1)
+
+    def update(self, new_apm_data, new_eapm_data):
+        changed = np.flatnonzero((new_apm_data != self.apm_data) | (new_eapm_data != self.eapm_data))
+        self.apm_data = new_apm_data
+        self.eapm_data = new_eapm_data
+
+        y_top = rescaled_top(self.y_top, max(np.max(new_apm_data), np.max(new_eapm_data)),
+                             self.settings.max_actions_per_second)
+        if y_top is not None:
+            self.y_top = y_top
+            self.layout_y_axis()
+            changed = range(len(new_apm_data))
+        for i in changed:
+            self.place_bar(i)
+
+    def update_settings(self):
+        self.setup_items()
+
+    def destroy(self):
+        self.canvas.destroy()
+
+GRAPH_BACKENDS = {
+    'matplotlib': MatplotlibGraph,
+    'canvas': CanvasGraph,
+}
+
+class GraphFrame:
+    """
+    Hosts the live graph and drives it from a Tk ``after`` loop. The
+    renderer is picked by the graph_backend setting and built the first
+    time the Graph tab is opened, so the canvas backend never imports
+    matplotlib; only export_graph does.
+    """
+
+    def __init__(self, parent, tracker):
+        self.parent = parent
+        self.tracker = tracker
+        self.frame = ttk.Frame(parent)
+        self.animation_running = False
+        self.update_job = None
+        self.renderer = None
+        self.backend = None
+        self.frame_latency = REGISTRY.histogram('apm_graph_frame_seconds', 'Time to render one graph frame',
+                                                FRAME_LATENCY_BUCKETS)
+
+    def setup_renderer(self):
+        if self.renderer:
+            self.renderer.destroy()
+        backend = self.tracker.settings_manager.graph_backend
+        if backend not in GRAPH_BACKENDS:
+            logging.warning(f"Unknown graph backend '{backend}', using {DEFAULT_GRAPH_BACKEND}")
+            backend = DEFAULT_GRAPH_BACKEND
+        self.renderer = GRAPH_BACKENDS[backend](self.frame, self.tracker.settings_manager)
+        self.backend = backend
+        logging.info(f"Graph backend: {backend}")
 
     def start_animation(self):
+        if self.renderer is None:
+            self.setup_renderer()
         if not self.animation_running:
-            self.ani.event_source.start()
             self.animation_running = True
+            self.update_job = self.frame.after(0, self.animate)
 
     def stop_animation(self):
         if self.animation_running:
-            self.ani.event_source.stop()
             self.animation_running = False
+            if self.update_job:
+                self.frame.after_cancel(self.update_job)
+                self.update_job = None
 
-    def update_graph(self, frame):
-        current_time = self.tracker.data_manager.current_time()
-        new_apm_data = np.zeros(self.tracker.settings_manager.graph_time_range)
-        new_eapm_data = np.zeros(self.tracker.settings_manager.graph_time_range)
-
-        for t in self.tracker.data_manager.actions:
-            if current_time - t <= self.tracker.settings_manager.graph_time_range:
-                index = int(current_time - t)
-                if index < self.tracker.settings_manager.graph_time_range:
-                    new_apm_data[index] += 1
-
-        for t in self.tracker.data_manager.effective_actions:
-            if current_time - t <= self.tracker.settings_manager.graph_time_range:
-                index = int(current_time - t)
-                if index < self.tracker.settings_manager.graph_time_range:
-                    new_eapm_data[index] += 1
-
-        # Update bar heights
-        for rect, h in zip(self.apm_bars, new_apm_data):
-            rect.set_height(h)
-        for rect, h in zip(self.eapm_bars, new_eapm_data):
-            rect.set_height(h)
-
-        # Dynamically adjust y-axis
-        max_value = max(np.max(new_apm_data), np.max(new_eapm_data))
-        y_max = min(max(max_value * 1.1, 1), self.tracker.settings_manager.max_actions_per_second)
-        self.ax.set_ylim(0, y_max)
-
-        # Update y-axis ticks
-        self.ax.yaxis.set_major_locator(plt.MaxNLocator(integer=True, nbins=5))
-
-        # Force redraw of the figure
-        self.figure.canvas.draw()
-
-        if not np.array_equal(new_apm_data, self.apm_data) or not np.array_equal(new_eapm_data, self.eapm_data):
-            self.apm_data = new_apm_data
-            self.eapm_data = new_eapm_data
-
-            for rect, h in zip(self.apm_bars, self.apm_data):
-                rect.set_height(h)
-            for rect, h in zip(self.eapm_bars, self.eapm_data):
-                rect.set_height(h)
-
-            max_value = max(np.max(self.apm_data), np.max(self.eapm_data))
-            y_max = min(max(max_value * 1.1, 1), self.tracker.settings_manager.max_actions_per_second)
-            self.ax.set_ylim(0, y_max)
-            self.ax.yaxis.set_major_locator(plt.MaxNLocator(integer=True, nbins=5))
-
-            self.figure.canvas.draw()
+    def animate(self):
+        self.update_job = None
+        if not self.animation_running:
+            return
+        try:
+            self.update_graph()
+        except Exception as e:
+            logging.error(f"Error updating graph: {str(e)}")
+        self.update_job = self.frame.after(self.tracker.settings_manager.graph_update_interval, self.animate)
 
-        return self.apm_bars + self.eapm_bars
+    def update_graph(self):
+        start = time.perf_counter()
+        current_time = self.tracker.data_manager.current_time()
+        apm_data, eapm_data = self.tracker.data_manager.histogram(
+            current_time, self.tracker.settings_manager.graph_time_range)
+        self.renderer.update(apm_data, eapm_data)
+        self.frame_latency.observe(time.perf_counter() - start)
 
     def update_graph_settings(self):
-        # Update graph based on new settings
-        self.ax.clear()
-        x = range(self.tracker.settings_manager.graph_time_range)
-        self.apm_data = np.zeros(self.tracker.settings_manager.graph_time_range)
-        self.eapm_data = np.zeros(self.tracker.settings_manager.graph_time_range)
-        self.apm_bars = self.ax.bar(x, self.apm_data, color=GRAPH_APM_COLOR, alpha=GRAPH_ALPHA, label='APM')
-        self.eapm_bars = self.ax.bar(x, self.eapm_data, color=GRAPH_EAPM_COLOR, alpha=GRAPH_ALPHA, label='eAPM')
+        if self.renderer is None:
+            return  # The graph picks up the settings when it is first built
+        if self.tracker.settings_manager.graph_backend != self.backend:
+            self.setup_renderer()
+        else:
+            self.renderer.update_settings()
 
-        self.ax.legend(loc='upper left')
-        self.ax.set_title('APM and eAPM over time')
-        self.ax.set_xlabel('Time (seconds ago)')
-        self.ax.set_ylabel('Number of Actions')
-        
-        self.ax.set_xlim(self.tracker.settings_manager.graph_time_range - 1, 0)
-        self.ax.set_ylim(0, self.tracker.settings_manager.max_actions_per_second)
-        self.ax.set_xticks([0, self.tracker.settings_manager.graph_time_range // 2, self.tracker.settings_manager.graph_time_range - 1])
-        self.ax.set_xticklabels(['0', str(self.tracker.settings_manager.graph_time_range // 2), str(self.tracker.settings_manager.graph_time_range)])
-        self.ax.yaxis.set_major_locator(plt.MaxNLocator(integer=True, nbins=5))
-
-        self.canvas.draw()
-    
     def export_graph(self):
         try:
             # Create a new figure for export (to avoid modifying the displayed graph)
+            plt = pyplot()
             fig, ax = plt.subplots(figsize=(10, 6))
 
             current_time = self.tracker.data_manager.current_time()
             x = np.arange(self.tracker.settings_manager.graph_time_range)
-            
-            apm_data = np.zeros(self.tracker.settings_manager.graph_time_range)
-            eapm_data = np.zeros(self.tracker.settings_manager.graph_time_range)
-
-            for t in self.tracker.data_manager.actions:
-                if current_time - t <= self.tracker.settings_manager.graph_time_range:
-                    index = int(current_time - t)
-                    if index < self.tracker.settings_manager.graph_time_range:
-                        apm_data[index] += 1
-
-            for t in self.tracker.data_manager.effective_actions:
-                if current_time - t <= self.tracker.settings_manager.graph_time_range:
-                    index = int(current_time - t)
-                    if index < self.tracker.settings_manager.graph_time_range:
-                        eapm_data[index] += 1
+
+            apm_data, eapm_data = self.tracker.data_manager.histogram(
+                current_time, self.tracker.settings_manager.graph_time_range)
 
             ax.bar(x, apm_data, color='blue', alpha=0.5, label='APM')
             ax.bar(x, eapm_data, color='green', alpha=0.5, label='eAPM')
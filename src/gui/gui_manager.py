@@ -1,13 +1,16 @@
 import tkinter as tk
 from tkinter import ttk
 import logging
+import time
 from utils import get_icon_path, set_window_icon, set_appwindow
 import platform
 from .main_frame import MainFrame
 from .graph_frame import GraphFrame
 from .settings_frame import SettingsFrame
+from .stats_frame import StatsFrame
 from .mini_window import MiniWindow
 from utils.constants import *
+from utils.metrics import REGISTRY
 
 class GUIManager:
     def __init__(self, tracker):
@@ -21,6 +24,8 @@ class GUIManager:
         self.update_counter = 0
         self.update_frequency = 5  # Update GUI every 5 cycles
         self.current_tab = 'Main'
+        self.tick_latency = REGISTRY.histogram('apm_gui_tick_seconds', 'Time spent in one GUI update',
+                                               FRAME_LATENCY_BUCKETS)
 
     def setup_gui(self):
         self.root = tk.Tk()
@@ -53,10 +58,12 @@ class GUIManager:
 
         self.main_frame = MainFrame(self.notebook, self.tracker)
         self.graph_frame = GraphFrame(self.notebook, self.tracker)
+        self.stats_frame = StatsFrame(self.notebook, self.tracker)
         self.settings_frame = SettingsFrame(self.notebook, self.tracker)
 
         self.notebook.add(self.main_frame.frame, text='Main')
         self.notebook.add(self.graph_frame.frame, text='Graph')
+        self.notebook.add(self.stats_frame.frame, text='Stats')
         self.notebook.add(self.settings_frame.frame, text='Settings')
 
         self.notebook.bind('<<NotebookTabChanged>>', self.on_tab_change)
@@ -97,25 +104,34 @@ class GUIManager:
         if not self.tracker.running:
             return
 
+        start = time.perf_counter()
         self.update_counter += 1
         if self.update_counter >= self.update_frequency:
             current_apm = self.tracker.data_manager.calculate_current_apm()
             current_eapm = self.tracker.data_manager.calculate_current_eapm()
-            avg_apm = self.tracker.data_manager.calculate_average_apm()
-            avg_eapm = self.tracker.data_manager.calculate_average_eapm()
-
-            self.tracker.data_manager.peak_apm = max(self.tracker.data_manager.peak_apm, current_apm)
-            self.tracker.data_manager.peak_eapm = max(self.tracker.data_manager.peak_eapm, current_eapm)
+            average_window = self.tracker.settings_manager.average_window
+            since = self.tracker.data_manager.current_time() - average_window * 60 if average_window else None
+            avg_apm = self.tracker.data_manager.calculate_average_apm(since)
+            avg_eapm = self.tracker.data_manager.calculate_average_eapm(since)
 
             self.main_frame.update_values(current_apm, current_eapm, 
                                           self.tracker.data_manager.peak_apm, 
                                           self.tracker.data_manager.peak_eapm,
                                           avg_apm, avg_eapm)
 
+            windows = self.tracker.settings_manager.apm_windows
+            window_values = self.tracker.data_manager.calculate_window_apm(windows)
+            self.main_frame.update_windows(windows, window_values)
+            self.mini_window.update_windows(windows, window_values)
+
             self.mini_window.update_values(current_apm, current_eapm)
+
+            if self.current_tab == 'Stats' and not self.is_mini_view:
+                self.stats_frame.update_stats()
             
             self.update_counter = 0
 
+        self.tick_latency.observe(time.perf_counter() - start)
         self.update_job = self.root.after(self.tracker.settings_manager.update_interval, self.update_gui)
 
     def update_graph_settings(self):
@@ -6,6 +6,14 @@ from utils.constants import (
     DATA_FONT_SIZE, LABEL_FONT_SIZE, FONT_NAME
 )
 
+def format_window(seconds):
+    if seconds >= 60 and seconds % 60 == 0:
+        return f"{seconds // 60}m"
+    return f"{seconds}s"
+
+def format_windows(windows, values):
+    return "   ".join(f"{format_window(seconds)} {apm}/{eapm}" for seconds, (apm, eapm) in zip(windows, values))
+
 class MainFrame:
     def __init__(self, parent, tracker):
         self.parent = parent
@@ -38,7 +46,7 @@ class MainFrame:
         middle_frame.grid(row=1, column=0, sticky='nsew')
         middle_frame.columnconfigure(0, weight=1)
         middle_frame.columnconfigure(1, weight=1)
-        for i in range(3):
+        for i in range(4):
             middle_frame.rowconfigure(i, weight=1)
 
         self.create_data_display(middle_frame, 0, 0, "Current APM", 'current_apm_var', TITLE_COLOR)
@@ -48,6 +56,12 @@ class MainFrame:
         self.create_data_display(middle_frame, 2, 0, "Average APM", 'avg_apm_var', '#c678dd')
         self.create_data_display(middle_frame, 2, 1, "Average eAPM", 'avg_eapm_var', '#56b6c2')
 
+        windows_frame = ttk.Frame(middle_frame, style='DataFrame.TFrame')
+        windows_frame.grid(row=3, column=0, columnspan=2, padx=10, pady=10, sticky='nsew')
+        ttk.Label(windows_frame, text="APM / eAPM by Window", style='DataLabel.TLabel').pack(pady=(5, 0))
+        self.windows_var = tk.StringVar()
+        ttk.Label(windows_frame, textvariable=self.windows_var, style='DataLabel.TLabel').pack(pady=(0, 5))
+
         bottom_frame = ttk.Frame(self.frame, style='MainFrame.TFrame')
         bottom_frame.grid(row=2, column=0, sticky='ew')
 
@@ -70,3 +84,6 @@ class MainFrame:
         self.peak_eapm_var.set(f"{peak_eapm}")
         self.avg_apm_var.set(f"{avg_apm:.2f}")
         self.avg_eapm_var.set(f"{avg_eapm:.2f}")
+
+    def update_windows(self, windows, values):
+        self.windows_var.set(format_windows(windows, values))
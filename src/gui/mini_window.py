@@ -6,6 +6,7 @@ from utils.constants import (
     MINI_WINDOW_EAPM_COLOR, MINI_WINDOW_LABEL_COLOR, FONT_NAME, MINI_WINDOW_SIZE,
     FONT_WEIGHT_BOLD
 )
+from .main_frame import format_windows
 
 class MiniWindow:
     def __init__(self, root, tracker):
@@ -40,6 +41,11 @@ class MiniWindow:
         self.eapm_value.pack(side='left')
         tk.Label(self.eapm_frame, text="eAPM", font=(FONT_NAME, MINI_WINDOW_SIZE), bg=MINI_WINDOW_BG_COLOR, fg=MINI_WINDOW_LABEL_COLOR).pack(side='right', padx=(1, 0))
 
+        # Optional line with APM/eAPM over several trailing windows
+        self.windows_var = tk.StringVar()
+        self.windows_label = tk.Label(self.frame, textvariable=self.windows_var, font=(FONT_NAME, MINI_WINDOW_SIZE - 4), bg=MINI_WINDOW_BG_COLOR, fg=MINI_WINDOW_LABEL_COLOR, anchor='w')
+        self.windows_visible = False
+
         self.window.bind('<ButtonPress-1>', self.start_move)
         self.window.bind('<B1-Motion>', self.do_move)
         self.window.bind('<Double-Button-1>', self.tracker.gui_manager.toggle_view)
@@ -75,10 +81,24 @@ class MiniWindow:
         self.eapm_var.set(f"{current_eapm}")
         self.adjust_size()
 
+    def update_windows(self, windows, values):
+        show = self.tracker.settings_manager.mini_window_show_windows
+        if show != self.windows_visible:
+            if show:
+                self.windows_label.pack(fill='x', padx=2, pady=(0, 2))
+            else:
+                self.windows_label.pack_forget()
+            self.windows_visible = show
+        if show:
+            self.windows_var.set(format_windows(windows, values))
+
     def adjust_size(self):
         self.window.update_idletasks()
         width = max(self.apm_frame.winfo_reqwidth(), self.eapm_frame.winfo_reqwidth())
         height = self.apm_frame.winfo_reqheight() + self.eapm_frame.winfo_reqheight()
+        if self.windows_visible:
+            width = max(width, self.windows_label.winfo_reqwidth())
+            height += self.windows_label.winfo_reqheight()
 
         # Add minimal padding
         width += 4
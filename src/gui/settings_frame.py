@@ -2,9 +2,9 @@ import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
 import logging
 import datetime
-import matplotlib.pyplot as plt
 import threading
 from utils.constants import * 
+from .graph_frame import pyplot
 
 class SettingsFrame:
     def __init__(self, parent, tracker):
@@ -77,7 +77,9 @@ class SettingsFrame:
         self.transparency_scale.pack(pady=5, padx=10, fill="x")
 
         ttk.Label(parent, text="Target Program:", font=label_font).pack(pady=5, padx=10, anchor="w")
-        self.target_program_combobox = ttk.Combobox(parent, values=self.tracker.settings_manager.window_list, font=entry_font)
+        # The process scan is slow, so the list is only filled when first opened
+        self.target_program_combobox = ttk.Combobox(parent, values=self.tracker.settings_manager.window_list, font=entry_font,
+                                                    postcommand=self.load_window_list)
         self.target_program_combobox.set(self.tracker.settings_manager.target_program)
         self.target_program_combobox.pack(pady=5, padx=10, fill="x")
         ttk.Button(parent, text="Set Target Program", command=self.set_target_program, style='TButton').pack(pady=5, padx=10)
@@ -112,6 +114,14 @@ class SettingsFrame:
         self.graph_time_range_combobox.pack(pady=5, padx=10, fill="x")
         self.graph_time_range_combobox.bind("<<ComboboxSelected>>", self.on_graph_time_range_change)
 
+        ttk.Label(parent, text="Graph Renderer:", font=label_font).pack(pady=5, padx=10, anchor="w")
+        self.graph_backend_combobox = ttk.Combobox(parent,
+            values=self.tracker.settings_manager.graph_backend_options,
+            state='readonly',
+            font=entry_font)
+        self.graph_backend_combobox.set(self.tracker.settings_manager.graph_backend)
+        self.graph_backend_combobox.pack(pady=5, padx=10, fill="x")
+
         ttk.Label(parent, text="Max Actions Per Second:", font=label_font).pack(pady=5, padx=10, anchor="w")
         self.max_actions_per_second_entry = ttk.Entry(parent, font=entry_font)
         self.max_actions_per_second_entry.insert(0, str(self.tracker.settings_manager.max_actions_per_second))
@@ -127,6 +137,48 @@ class SettingsFrame:
         self.eaction_cooldown_entry.insert(0, str(int(self.tracker.settings_manager.eapm_cooldown * 1000)))
         self.eaction_cooldown_entry.pack(pady=5, padx=10, fill="x")
 
+        ttk.Label(parent, text="Average Over Last (min, 0 = whole session):", font=label_font).pack(pady=5, padx=10, anchor="w")
+        self.average_window_entry = ttk.Entry(parent, font=entry_font)
+        self.average_window_entry.insert(0, str(self.tracker.settings_manager.average_window))
+        self.average_window_entry.pack(pady=5, padx=10, fill="x")
+
+        ttk.Label(parent, text="APM Windows (s, comma-separated):", font=label_font).pack(pady=5, padx=10, anchor="w")
+        self.apm_windows_entry = ttk.Entry(parent, font=entry_font)
+        self.apm_windows_entry.insert(0, ", ".join(str(w) for w in self.tracker.settings_manager.apm_windows))
+        self.apm_windows_entry.pack(pady=5, padx=10, fill="x")
+
+        self.mini_window_show_windows_var = tk.BooleanVar(value=self.tracker.settings_manager.mini_window_show_windows)
+        ttk.Checkbutton(parent, text="Show APM windows in mini window", variable=self.mini_window_show_windows_var).pack(pady=5, padx=10, anchor="w")
+
+        self.session_history_var = tk.BooleanVar(value=self.tracker.settings_manager.session_history)
+        ttk.Checkbutton(parent, text="Save session history (from next start)", variable=self.session_history_var).pack(pady=5, padx=10, anchor="w")
+        self.session_history_keys_var = tk.BooleanVar(value=self.tracker.settings_manager.session_history_keys)
+        ttk.Checkbutton(parent, text="Include which keys were pressed in session history", variable=self.session_history_keys_var).pack(pady=5, padx=10, anchor="w")
+
+        self.overlay_server_var = tk.BooleanVar(value=self.tracker.settings_manager.overlay_server)
+        ttk.Checkbutton(parent, text="Serve stream overlay (from next start)", variable=self.overlay_server_var).pack(pady=5, padx=10, anchor="w")
+
+        self.shared_stats_var = tk.BooleanVar(value=self.tracker.settings_manager.shared_stats)
+        ttk.Checkbutton(parent, text="Publish stats to shared memory (from next start)", variable=self.shared_stats_var).pack(pady=5, padx=10, anchor="w")
+
+        self.metrics_server_var = tk.BooleanVar(value=self.tracker.settings_manager.metrics_server)
+        ttk.Checkbutton(parent, text="Serve tracker metrics (from next start)", variable=self.metrics_server_var).pack(pady=5, padx=10, anchor="w")
+
+        ttk.Label(parent, text="Overlay Port:", font=label_font).pack(pady=5, padx=10, anchor="w")
+        self.overlay_port_entry = ttk.Entry(parent, font=entry_font)
+        self.overlay_port_entry.insert(0, str(self.tracker.settings_manager.overlay_port))
+        self.overlay_port_entry.pack(pady=5, padx=10, fill="x")
+
+        ttk.Label(parent, text="Overlay Updates Per Second:", font=label_font).pack(pady=5, padx=10, anchor="w")
+        self.overlay_push_rate_entry = ttk.Entry(parent, font=entry_font)
+        self.overlay_push_rate_entry.insert(0, str(self.tracker.settings_manager.overlay_push_rate))
+        self.overlay_push_rate_entry.pack(pady=5, padx=10, fill="x")
+
+        ttk.Label(parent, text="Metrics Port:", font=label_font).pack(pady=5, padx=10, anchor="w")
+        self.metrics_port_entry = ttk.Entry(parent, font=entry_font)
+        self.metrics_port_entry.insert(0, str(self.tracker.settings_manager.metrics_port))
+        self.metrics_port_entry.pack(pady=5, padx=10, fill="x")
+
         ttk.Button(parent, text="Apply Settings", command=self.apply_settings, style='TButton').pack(pady=10, padx=10)
         ttk.Button(parent, text="Export Data", command=self.export_data, style='TButton').pack(pady=10, padx=10)
         ttk.Button(parent, text="Export Graph", command=self.export_graph, style='TButton').pack(pady=10, padx=10)
@@ -147,6 +199,10 @@ class SettingsFrame:
         self.target_program_combobox.set('')
         logging.info("Target program cleared")
 
+    def load_window_list(self):
+        if not self.tracker.settings_manager.window_list_loaded:
+            self.refresh_window_list()
+
     def refresh_window_list(self):
         self.tracker.settings_manager.update_window_list()
         self.target_program_combobox['values'] = self.tracker.settings_manager.window_list
@@ -171,9 +227,21 @@ class SettingsFrame:
             new_settings = {
                 'update_interval': int(self.update_interval_entry.get()),
                 'graph_update_interval': int(self.graph_update_interval_entry.get()),
+                'graph_backend': self.graph_backend_combobox.get(),
                 'max_actions_per_second': int(self.max_actions_per_second_entry.get()),
                 'action_cooldown': int(self.action_cooldown_entry.get()) / 1000,
-                'eapm_cooldown': int(self.eaction_cooldown_entry.get()) / 1000
+                'eapm_cooldown': int(self.eaction_cooldown_entry.get()) / 1000,
+                'average_window': int(self.average_window_entry.get()),
+                'apm_windows': [int(w) for w in self.apm_windows_entry.get().split(',') if w.strip()],
+                'mini_window_show_windows': self.mini_window_show_windows_var.get(),
+                'session_history': self.session_history_var.get(),
+                'session_history_keys': self.session_history_keys_var.get(),
+                'overlay_server': self.overlay_server_var.get(),
+                'overlay_port': int(self.overlay_port_entry.get()),
+                'overlay_push_rate': float(self.overlay_push_rate_entry.get()),
+                'shared_stats': self.shared_stats_var.get(),
+                'metrics_server': self.metrics_server_var.get(),
+                'metrics_port': int(self.metrics_port_entry.get())
             }
             self.tracker.settings_manager.update_settings(**new_settings)
             self.tracker.gui_manager.update_graph_settings()
@@ -205,7 +273,7 @@ class SettingsFrame:
                 self.tracker.gui_manager.root.after(0, lambda: messagebox.showerror("Export Error", "Failed to create graph for export."))
                 return
             fig.savefig(file_path, dpi=300, bbox_inches='tight')
-            plt.close(fig)
+            pyplot().close(fig)
             logging.info(f"Graph exported to {file_path}")
             self.tracker.gui_manager.root.after(0, lambda: messagebox.showinfo("Export Successful", f"Graph exported to {file_path}"))
         except Exception as e:
@@ -216,7 +284,8 @@ class SettingsFrame:
         default_filename = f"apm_data_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
         file_path = filedialog.asksaveasfilename(
             defaultextension=".csv",
-            filetypes=[("CSV files", "*.csv"), ("All files", "*.*")],
+            filetypes=[("CSV files", "*.csv"), ("Arrow files", "*.arrow"),
+                       ("Parquet files", "*.parquet"), ("All files", "*.*")],
             initialfile=default_filename
         )
         if file_path:
@@ -226,9 +295,18 @@ class SettingsFrame:
 
     def _export_data_thread(self, file_path):
         try:
-            exported_file = self.tracker.data_manager.export_data(file_path)
+            if file_path.lower().endswith(COLUMNAR_EXTENSIONS):
+                exported_file = self.tracker.data_manager.export_columnar(
+                    file_path, self.tracker.settings_manager.session_history_keys)
+            else:
+                exported_file = self.tracker.data_manager.export_data(file_path)
             logging.info(f"Data exported to {exported_file}")
-            self.tracker.gui_manager.root.after(0, lambda: messagebox.showinfo("Export Successful", f"Data exported to {exported_file}"))
+            message = f"Data exported to {exported_file}"
+            since = self.tracker.data_manager.retained_since()
+            if since is not None:
+                message += (f"\n\nIt covers actions since {self.tracker.data_manager.format_timestamp(since)}. "
+                            "Older actions are in the session history database.")
+            self.tracker.gui_manager.root.after(0, lambda: messagebox.showinfo("Export Successful", message))
         except Exception as e:
             logging.error(f"Error exporting data: {str(e)}")
             self.tracker.gui_manager.root.after(0, lambda: messagebox.showerror("Export Error", f"Failed to export data: {str(e)}"))
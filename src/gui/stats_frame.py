@@ -0,0 +1,93 @@
+import tkinter as tk
+from tkinter import ttk, messagebox, filedialog
+import logging
+import datetime
+from utils.interval_sketch import load_sketches, merge_sketches
+from utils.constants import INTERVAL_QUANTILES
+
+class StatsFrame:
+    def __init__(self, parent, tracker):
+        self.parent = parent
+        self.tracker = tracker
+        self.frame = ttk.Frame(parent)
+        self.merged_sketches = None  # Saved sessions merged in by the user
+        self.merged_count = 0
+        self.setup_stats_frame()
+
+    def setup_stats_frame(self):
+        self.title_var = tk.StringVar()
+        ttk.Label(self.frame, textvariable=self.title_var, style='TLabel').pack(pady=(10, 5))
+
+        columns = ['count', 'mean'] + [f"p{round(q * 100)}" for q in INTERVAL_QUANTILES]
+        self.tree = ttk.Treeview(self.frame, columns=columns, height=12)
+        self.tree.heading('#0', text="Intervals before")
+        self.tree.column('#0', width=140)
+        for column in columns:
+            self.tree.heading(column, text=column if column == 'count' else f"{column} (ms)")
+            self.tree.column(column, width=80, anchor='e')
+        self.tree.pack(expand=True, fill='both', padx=10, pady=5)
+
+        buttons = ttk.Frame(self.frame)
+        buttons.pack(pady=10)
+        ttk.Button(buttons, text="Save Intervals", command=self.save_intervals, style='TButton').pack(side=tk.LEFT, padx=5)
+        ttk.Button(buttons, text="Merge Saved Sessions", command=self.merge_sessions, style='TButton').pack(side=tk.LEFT, padx=5)
+        ttk.Button(buttons, text="Current Session Only", command=self.clear_merged, style='TButton').pack(side=tk.LEFT, padx=5)
+
+        self.update_stats()
+
+    def update_stats(self):
+        sketches = self.tracker.data_manager.interval_sketches()
+        if self.merged_sketches:
+            sketches = merge_sketches(sketches, self.merged_sketches)
+            self.title_var.set(f"Time between actions: this session + {self.merged_count} saved")
+        else:
+            self.title_var.set("Time between actions: this session")
+
+        self.tree.delete(*self.tree.get_children())
+        for name, sketch in sketches.items():
+            label = "any action" if name == 'all' else name.replace('_', ' ')
+            values = [sketch.mean()] + sketch.quantiles(INTERVAL_QUANTILES)
+            self.tree.insert('', 'end', text=label,
+                             values=[sketch.count] + [self.format_ms(v) for v in values])
+
+    def format_ms(self, seconds):
+        return "-" if seconds is None else f"{seconds * 1000:.1f}"
+
+    def save_intervals(self):
+        default_filename = f"apm_intervals_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+        file_path = filedialog.asksaveasfilename(
+            defaultextension=".json",
+            filetypes=[("JSON files", "*.json"), ("All files", "*.*")],
+            initialfile=default_filename
+        )
+        if not file_path:
+            logging.info("Interval export cancelled by user")
+            return
+        try:
+            self.tracker.data_manager.save_intervals(file_path)
+            logging.info(f"Intervals saved to {file_path}")
+        except Exception as e:
+            logging.error(f"Error saving intervals: {str(e)}")
+            messagebox.showerror("Save Error", f"Failed to save intervals: {str(e)}")
+
+    def merge_sessions(self):
+        file_paths = filedialog.askopenfilenames(filetypes=[("JSON files", "*.json"), ("All files", "*.*")])
+        if not file_paths:
+            return
+        merged = merge_sketches({}, self.merged_sketches or {})
+        try:
+            for file_path in file_paths:
+                merge_sketches(merged, load_sketches(file_path))
+        except Exception as e:
+            logging.error(f"Error merging intervals: {str(e)}")
+            messagebox.showerror("Merge Error", f"Failed to merge intervals: {str(e)}")
+            return
+        self.merged_sketches = merged
+        self.merged_count += len(file_paths)
+        logging.info(f"Merged intervals from {len(file_paths)} saved session(s)")
+        self.update_stats()
+
+    def clear_merged(self):
+        self.merged_sketches = None
+        self.merged_count = 0
+        self.update_stats()
@@ -0,0 +1,58 @@
+import json
+import logging
+import signal
+import sys
+import threading
+import traceback
+from base_tracker import BaseTracker
+from utils.input_manager import InputManager
+from utils.constants import HEADLESS_STATS_INTERVAL
+
+class HeadlessTracker(BaseTracker):
+    """
+    Input hooks and stats without any window. Imports nothing from tkinter
+    or matplotlib, and writes one JSON object per line with the current
+    stats every ``interval`` seconds to ``output`` (stdout by default).
+    ``run`` returns the process exit status, 1 if the input hooks died.
+    """
+
+    def __init__(self, interval=HEADLESS_STATS_INTERVAL, output=None):
+        super().__init__()
+        self.interval = interval
+        self.output_path = output
+        self.input_manager = InputManager(self)
+        self.stop_event = threading.Event()
+
+    def run(self):
+        try:
+            self.start_input()
+            self.start_services()
+            for signum in (signal.SIGINT, signal.SIGTERM):
+                signal.signal(signum, lambda *_: self.stop_event.set())
+
+            output = open(self.output_path, 'a', buffering=1) if self.output_path else sys.stdout
+            try:
+                logging.info(f"Running headless, writing stats every {self.interval}s to {self.output_path or 'stdout'}")
+                while not self.stop_event.wait(self.interval):
+                    # Without the hooks every line would report zero APM
+                    if not self.input_thread.is_alive():
+                        logging.error("Input hooks stopped, no actions can be recorded. Exiting.")
+                        return 1
+                    output.write(json.dumps(self.get_stats_snapshot()) + '\n')
+                    output.flush()
+            finally:
+                if output is not sys.stdout:
+                    output.close()
+            return 0
+        except Exception as e:
+            logging.error(f"Error in headless run: {str(e)}")
+            logging.debug(traceback.format_exc())
+            raise
+        finally:
+            self.stop_services()
+
+    def get_stats_snapshot(self):
+        snapshot = super().get_stats_snapshot()
+        snapshot['queue_depth'] = self.input_manager.queue_depth()
+        snapshot['dropped_events'] = self.input_manager.dropped_events
+        return snapshot
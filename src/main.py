@@ -1,10 +1,12 @@
+import argparse
 import logging
 import os
 from logging.handlers import RotatingFileHandler
 import traceback
-from tracker import APMTracker
-from utils.constants import LOG_LEVELS
-from utils.error_handler import safe_operation, APMTrackerError, handle_exception
+from utils.startup_timer import StartupTimer
+startup_timer = StartupTimer()
+from utils.constants import LOG_LEVELS, HEADLESS_STATS_INTERVAL
+from utils.error_handler import safe_operation, APMTrackerError, handle_exception, disable_error_dialogs
 import sys
 
 def setup_logging(log_level):
@@ -27,26 +29,49 @@ def setup_logging(log_level):
     # Disable matplotlib debug logging
     logging.getLogger('matplotlib').setLevel(logging.WARNING)
 
+def parse_args():
+    parser = argparse.ArgumentParser(description="APM Tracker")
+    parser.add_argument('--headless', action='store_true',
+                        help="run without a window and print stats as JSON lines")
+    parser.add_argument('--interval', type=float, default=HEADLESS_STATS_INTERVAL,
+                        help="seconds between stats lines in headless mode")
+    parser.add_argument('--output', help="append headless stats to this file instead of stdout")
+    return parser.parse_args()
+
 @safe_operation
 def main():
     """
     Main function to initialize and run the APM Tracker.
     """
-    tracker = APMTracker()
+    args = parse_args()
+    if args.headless:
+        # Keep tkinter and matplotlib out of the process entirely
+        disable_error_dialogs()
+        from headless import HeadlessTracker
+        tracker = HeadlessTracker(interval=max(args.interval, 0.05), output=args.output)
+    else:
+        from tracker import APMTracker
+        tracker = APMTracker()
+    startup_timer.mark('imports')
     tracker.settings_manager.load_settings()
+    startup_timer.mark('settings')
 
     # Set up logging based on user settings
     setup_logging(tracker.settings_manager.log_level)
 
     logging.info("Starting APM Tracker")
-    tracker.run()
+    if args.headless:
+        return tracker.run()
+    tracker.run(startup_timer)
+    return 0
 
 if __name__ == "__main__":
     # Set the global exception handler
     sys.excepthook = handle_exception
 
+    exit_status = 1
     try:
-        main()
+        exit_status = main()
     except APMTrackerError as e:
         logging.critical(f"Critical error in main: {str(e)}")
         logging.debug(traceback.format_exc())
@@ -55,3 +80,4 @@ if __name__ == "__main__":
         logging.debug(traceback.format_exc())
     finally:
         logging.info("APM Tracker shutting down")
+    sys.exit(exit_status)
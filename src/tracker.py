@@ -1,43 +1,52 @@
-import threading
 import logging
 import traceback
+from base_tracker import BaseTracker
 from gui.gui_manager import GUIManager
 from utils.input_manager import InputManager
-from utils.data_manager import DataManager
-from utils.settings_manager import SettingsManager
 
-class APMTracker:
+class APMTracker(BaseTracker):
     def __init__(self):
-        self.running = True
-        self.data_manager = DataManager()
-        self.settings_manager = SettingsManager()
+        super().__init__()
         self.gui_manager = GUIManager(self)
         self.input_manager = InputManager(self)
+        self.startup_timer = None
 
-    def run(self):
+    def run(self, startup_timer=None):
+        """Run the GUI. Settings must already be loaded, see main()."""
         try:
-            # Import constants only when needed
-            from utils.constants import DEFAULT_UPDATE_INTERVAL
-            
+            self.startup_timer = startup_timer
             self.gui_manager.setup_gui()
-            self.settings_manager.load_settings()
-            self.input_thread = threading.Thread(target=self.input_manager.input_loop, daemon=True)
-            self.input_thread.start()
-            self.gui_manager.update_gui()
+            self.mark_startup('gui')
+            self.start_input()
+            self.start_services()
+            self.mark_startup('background threads')
+            # Idle callbacks run after Tk has drawn the pending windows
+            self.gui_manager.root.after_idle(self.on_first_paint)
             self.gui_manager.run_main_loop()
         except Exception as e:
             logging.error(f"Error in run method: {str(e)}")
             logging.debug(traceback.format_exc())
             raise
 
+    def mark_startup(self, phase):
+        if self.startup_timer:
+            self.startup_timer.mark(phase)
+
+    def on_first_paint(self):
+        if self.startup_timer:
+            self.startup_timer.mark('first paint')
+            self.startup_timer.report()
+            self.startup_timer = None
+
     def on_closing(self):
         self.settings_manager.save_settings()
-        self.running = False
-        self.input_manager.input_event.set()  # Ensure input_loop exits
-        self.input_thread.join()
+        self.stop_services()
         self.gui_manager.root.quit()
 
-    def on_action(self, action_type):
-        self.data_manager.record_action(action_type)
+    def on_action(self, action_type, key=None, timestamp=None):
+        super().on_action(action_type, key, timestamp)
+        self.gui_manager.graph_needs_update = True
+
+    def on_actions(self, events):
+        super().on_actions(events)
         self.gui_manager.graph_needs_update = True
-        self.input_manager.input_event.set()
@@ -1,9 +1,17 @@
-from .input_manager import InputManager
-from .data_manager import DataManager
-from .settings_manager import SettingsManager
+import importlib
 from .constants import *
-from .window_utils import update_window_list, set_appwindow
-from .icon_utils import get_icon_path, set_window_icon
+
+# Submodules are imported on first attribute access, so importing a single
+# module such as utils.constants does not pull in pynput, psutil or tkinter.
+_LAZY_EXPORTS = {
+    'InputManager': '.input_manager',
+    'DataManager': '.data_manager',
+    'SettingsManager': '.settings_manager',
+    'update_window_list': '.window_utils',
+    'set_appwindow': '.window_utils',
+    'get_icon_path': '.icon_utils',
+    'set_window_icon': '.icon_utils',
+}
 
 __all__ = [
     'InputManager',
@@ -15,4 +23,9 @@ __all__ = [
     'set_window_icon',
 ]
 
+def __getattr__(name):
+    if name in _LAZY_EXPORTS:
+        return getattr(importlib.import_module(_LAZY_EXPORTS[name], __name__), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 # Note: Constants are imported with *, so they don't need to be listed in __all__
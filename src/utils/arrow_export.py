@@ -0,0 +1,113 @@
+import numpy as np
+from utils.event_store import EventColumns
+from utils.key_codes import KEY_NAMES
+from utils.constants import ACTION_KINDS, ACTION_CATEGORIES
+
+# pyarrow is optional and only imported when a columnar file is written or read.
+PARQUET_EXTENSIONS = ('.parquet', '.pq')
+
+def _pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.ipc
+    except ImportError:
+        raise ImportError("Arrow and Parquet export need pyarrow. Install it with 'pip install pyarrow'.")
+    return pyarrow
+
+def is_parquet(filename):
+    return filename.lower().endswith(PARQUET_EXTENSIONS)
+
+# Dictionary values must be unique, so codes without a name get a placeholder
+KEY_DICTIONARY = [name or f"#{code}" for code, name in enumerate(KEY_NAMES)]
+
+def session_schema(pa, store_keys=False):
+    """The columns of an exported session. ``key`` is only included when ``store_keys`` is set."""
+    fields = [
+        ('timestamp', pa.timestamp('us', tz='UTC')),
+        ('action_type', pa.dictionary(pa.int8(), pa.string())),
+        ('key', pa.dictionary(pa.int16(), pa.string())),
+        ('category', pa.dictionary(pa.int8(), pa.string())),
+        ('effective', pa.bool_()),
+        ('weight', pa.float32()),
+    ]
+    if not store_keys:
+        fields = [field for field in fields if field[0] != 'key']
+    return pa.schema(fields)
+
+def columns_to_batch(pa, columns, schema):
+    """One record batch for a block of store columns, reusing the numeric buffers."""
+    kinds = pa.array(ACTION_KINDS)
+    keys = pa.array(KEY_DICTIONARY)
+    categories = pa.array(ACTION_CATEGORIES)
+    timestamps = np.round(columns.timestamps * 1e6).astype(np.int64)
+    arrays = {
+        'timestamp': pa.array(timestamps, type=schema.field('timestamp').type),
+        'action_type': pa.DictionaryArray.from_arrays(columns.kinds.astype(np.int8), kinds),
+        'category': pa.DictionaryArray.from_arrays(columns.categories.astype(np.int8), categories),
+        'effective': pa.array(columns.weights > 0),
+        'weight': pa.array(columns.weights),
+    }
+    if 'key' in schema.names:
+        arrays['key'] = pa.DictionaryArray.from_arrays(columns.keys.astype(np.int16), keys)
+    return pa.record_batch([arrays[name] for name in schema.names], schema=schema)
+
+def write_session(filename, chunks, store_keys=False):
+    """
+    Write column chunks to an Arrow IPC file, or Parquet when the name ends
+    in .parquet. IPC files are uncompressed so they can be memory-mapped
+    back without copying. Which key was pressed is only written when
+    ``store_keys`` is set.
+    """
+    pa = _pyarrow()
+    schema = session_schema(pa, store_keys)
+    if is_parquet(filename):
+        import pyarrow.parquet as pq
+        with pq.ParquetWriter(filename, schema) as writer:
+            for columns in chunks:
+                writer.write_batch(columns_to_batch(pa, columns, schema))
+    else:
+        with pa.OSFile(filename, 'wb') as sink, pa.ipc.new_file(sink, schema) as writer:
+            for columns in chunks:
+                writer.write_batch(columns_to_batch(pa, columns, schema))
+    return filename
+
+def load_session(filename):
+    """
+    Read a session written by write_session as a pyarrow Table. Arrow IPC
+    files are memory-mapped, so the table's buffers point into the page
+    cache and nothing is parsed or copied up front.
+    """
+    pa = _pyarrow()
+    if is_parquet(filename):
+        import pyarrow.parquet as pq
+        return pq.read_table(filename, memory_map=True)
+    return pa.ipc.open_file(pa.memory_map(filename, 'r')).read_all()
+
+def load_sessions(filenames):
+    """Concatenate several sessions into one Table without copying."""
+    pa = _pyarrow()
+    return pa.concat_tables([load_session(filename) for filename in filenames])
+
+def table_to_columns(table):
+    """EventColumns for a session Table, for replay or offline re-scoring."""
+    table = table.combine_chunks()
+
+    def codes(name, names, dtype):
+        if name not in table.column_names:
+            # Sessions exported without keys read back with every key unknown (0)
+            return np.zeros(table.num_rows, dtype=dtype)
+        column = table.column(name).chunk(0) if table.num_rows else None
+        if column is None:
+            return np.empty(0, dtype=dtype)
+        # Map the file's dictionary onto our code tables in case it was re-encoded
+        code_of = {value: code for code, value in enumerate(names)}
+        lookup = np.array([code_of[value] for value in column.dictionary.to_pylist()], dtype=dtype)
+        return lookup[column.indices.to_numpy(zero_copy_only=False)]
+
+    return EventColumns(
+        timestamps=table.column('timestamp').cast('int64').to_numpy() / 1e6,
+        weights=table.column('weight').to_numpy().astype(np.float32, copy=False),
+        categories=codes('category', ACTION_CATEGORIES, np.uint8),
+        kinds=codes('action_type', ACTION_KINDS, np.uint8),
+        keys=codes('key', KEY_DICTIONARY, np.uint16),
+    )
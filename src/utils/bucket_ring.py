@@ -0,0 +1,162 @@
+from utils.constants import MAX_APM_WINDOW
+
+class BucketRing:
+    """
+    Fixed-size ring of per-second buckets holding an action count and a
+    weighted sum. Running totals over the whole ring are kept up to date as
+    buckets expire, so "actions in the last N seconds" is O(1) for the full
+    window and O(N) for shorter ones.
+    """
+
+    def __init__(self, size=60):
+        self.size = size
+        self.counts = [0] * size
+        self.weights = [0.0] * size
+        self.total_count = 0
+        self.total_weight = 0.0
+        self.head = None  # Absolute second of the newest bucket
+
+    def advance(self, second):
+        if self.head is None:
+            self.head = second
+            return
+        if second <= self.head:
+            return
+
+        elapsed = second - self.head
+        if elapsed >= self.size:
+            # Everything in the ring has expired
+            self.counts = [0] * self.size
+            self.weights = [0.0] * self.size
+            self.total_count = 0
+            self.total_weight = 0.0
+        else:
+            for s in range(self.head + 1, second + 1):
+                index = s % self.size
+                self.total_count -= self.counts[index]
+                self.total_weight -= self.weights[index]
+                self.counts[index] = 0
+                self.weights[index] = 0.0
+            if self.total_count == 0:
+                # Drop accumulated float error whenever the window empties
+                self.total_weight = 0.0
+        self.head = second
+
+    def add(self, timestamp, weight=0.0):
+        second = int(timestamp)
+        if second != self.head:
+            self.advance(second)
+            if second <= self.head - self.size:
+                return  # Too old for the window
+        index = second % self.size
+        self.counts[index] += 1
+        self.weights[index] += weight
+        self.total_count += 1
+        self.total_weight += weight
+
+    def totals(self, timestamp):
+        self.advance(int(timestamp))
+        return self.total_count, self.total_weight
+
+    def window_totals(self, timestamp, seconds):
+        """Count and weighted sum for the trailing ``seconds`` buckets."""
+        self.advance(int(timestamp))
+        if seconds >= self.size:
+            return self.total_count, self.total_weight
+        count = 0
+        weight = 0.0
+        for s in range(self.head - seconds + 1, self.head + 1):
+            index = s % self.size
+            count += self.counts[index]
+            weight += self.weights[index]
+        return count, weight
+
+class HierarchicalBuckets:
+    """
+    Per-second buckets rolled up into coarser levels (10 seconds and one
+    minute by default). Every level is updated on each action, and a
+    trailing window is answered by covering it with the coarsest aligned
+    buckets available, so any window up to the finest level's retention
+    costs a few dozen lookups no matter how many actions it holds.
+    """
+
+    def __init__(self, levels=((1, MAX_APM_WINDOW), (10, 360), (60, 1440))):
+        # (bucket width in seconds, number of buckets kept) from fine to coarse
+        self.widths = [width for width, _ in levels]
+        self.slots = [slots for _, slots in levels]
+        self.counts = [[0] * slots for _, slots in levels]
+        self.weights = [[0.0] * slots for _, slots in levels]
+        self.stamps = [[-1] * slots for _, slots in levels]  # Absolute bucket held by each slot
+        # Actions in the newest second are summed here and written to every level on change
+        self.pending_second = None
+        self.pending_count = 0
+        self.pending_weight = 0.0
+
+    def add(self, timestamp, weight=0.0):
+        second = int(timestamp)
+        if second != self.pending_second:
+            self._flush()
+            self.pending_second = second
+        self.pending_count += 1
+        self.pending_weight += weight
+
+    def _flush(self):
+        if not self.pending_count:
+            return
+        second = self.pending_second
+        for level, width in enumerate(self.widths):
+            bucket = second // width
+            index = bucket % self.slots[level]
+            stamps = self.stamps[level]
+            if stamps[index] != bucket:
+                stamps[index] = bucket
+                self.counts[level][index] = 0
+                self.weights[level][index] = 0.0
+            self.counts[level][index] += self.pending_count
+            self.weights[level][index] += self.pending_weight
+        self.pending_count = 0
+        self.pending_weight = 0.0
+
+    def _bucket(self, level, start):
+        bucket = start // self.widths[level]
+        index = bucket % self.slots[level]
+        if self.stamps[level][index] != bucket:
+            return 0, 0.0
+        return self.counts[level][index], self.weights[level][index]
+
+    def range_totals(self, start, end):
+        """Count and weighted sum for whole seconds in [start, end)."""
+        self._flush()
+        count = 0
+        weight = 0.0
+        last_level = len(self.widths) - 1
+        for level, width in enumerate(self.widths):
+            if level < last_level:
+                next_width = self.widths[level + 1]
+                # Walk both edges in at this width until they align with the next level
+                while start < end and start % next_width and start + width <= end:
+                    c, w = self._bucket(level, start)
+                    count += c
+                    weight += w
+                    start += width
+                while end > start and end % next_width and end - width >= start:
+                    c, w = self._bucket(level, end - width)
+                    count += c
+                    weight += w
+                    end -= width
+            else:
+                while start < end:
+                    c, w = self._bucket(level, start)
+                    count += c
+                    weight += w
+                    start += width
+        return count, weight
+
+    def window_totals(self, timestamp, windows):
+        """
+        Totals for each trailing window of whole seconds completed by
+        ``timestamp``. The second in progress is left out, so a window of
+        ``seconds`` always covers exactly that many seconds.
+        """
+        end = int(timestamp)
+        return [self.range_totals(end - seconds, end) for seconds in windows]
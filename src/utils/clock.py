@@ -0,0 +1,49 @@
+import datetime
+import time
+
+class SystemClock:
+    """Wall clock used during normal tracking."""
+
+    def time(self):
+        return time.time()
+
+    def utcnow(self):
+        return datetime.datetime.now(datetime.timezone.utc)
+
+    def sleep(self, seconds):
+        time.sleep(seconds)
+
+class ManualClock(SystemClock):
+    """Clock that only moves when told to, for max-speed replays."""
+
+    def __init__(self, start=0.0):
+        self.now = start
+
+    def time(self):
+        return self.now
+
+    def utcnow(self):
+        return datetime.datetime.fromtimestamp(self.now, datetime.timezone.utc)
+
+    def set(self, timestamp):
+        self.now = timestamp
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+class ScaledClock(SystemClock):
+    """Clock starting at ``start`` that runs ``speed`` times faster than real time."""
+
+    def __init__(self, start, speed=1.0):
+        self.start = start
+        self.speed = speed
+        self.origin = time.perf_counter()
+
+    def time(self):
+        return self.start + (time.perf_counter() - self.origin) * self.speed
+
+    def utcnow(self):
+        return datetime.datetime.fromtimestamp(self.time(), datetime.timezone.utc)
+
+    def sleep(self, seconds):
+        time.sleep(seconds / self.speed)
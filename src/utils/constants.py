@@ -17,6 +17,16 @@ GRAPH_EAPM_COLOR = 'green'
 GRAPH_ALPHA = 0.5
 GRAPH_DPI = 100
 GRAPH_FIGSIZE = (5, 4)
+GRAPH_YLIM_HEADROOM = 1.25  # y-limit is set this far above the tallest bar ...
+GRAPH_YLIM_SHRINK = 0.4  # ... and only lowered once the tallest bar is below this fraction of it
+GRAPH_BLIT_MIN_SLOT_PIXELS = 3  # narrower bar slots redraw the whole plot area instead
+# Tk Canvas renderer. Canvas items have no alpha, so the fills are the
+# blended colours of the matplotlib graph's half-transparent bars.
+GRAPH_CANVAS_BG = 'white'
+GRAPH_CANVAS_APM_FILL = '#8080ff'
+GRAPH_CANVAS_EAPM_FILL = '#80c080'
+GRAPH_CANVAS_OVERLAP_FILL = '#408080'  # where the APM and eAPM bars overlap
+GRAPH_CANVAS_MARGINS = (60, 30, 15, 45)  # left, top, right, bottom pixels around the plot area
 
 # Window Constants
 MAIN_WINDOW_SIZE = "600x500"
@@ -42,13 +52,44 @@ DEFAULT_MAX_ACTIONS_PER_SECOND = 50
 DEFAULT_ACTION_COOLDOWN = 0.0010  # seconds
 DEFAULT_EAPM_COOLDOWN = 0.5  # seconds
 
+# Stats Constants
+APM_WINDOW_SECONDS = 60  # trailing window for current APM/eAPM
+DEFAULT_APM_WINDOWS = [5, 15, 60, 300]  # seconds, shown side by side
+MAX_APM_WINDOW = 600  # seconds of per-second buckets kept for windowed APM
+
+# Event Store Constants
+EVENT_STORE_INITIAL_CAPACITY = 4096  # rows, doubled when full
+EVENT_STORE_HOT_SECONDS = 600  # events younger than this always stay in RAM
+EVENT_STORE_SEGMENT_ROWS = 8192  # rows per spilled segment file (128 KiB)
+EXPORT_CHUNK_ROWS = 8192  # rows formatted and written per block when exporting
+EXPORT_BUFFER_SIZE = 1 << 20  # bytes
+COLUMNAR_EXTENSIONS = ('.arrow', '.feather', '.parquet', '.pq')  # exported with pyarrow instead of CSV
+
+# Rollup Constants
+ROLLUP_RAW_SECONDS = 3600  # raw events are kept this long, then only rollups remain
+ROLLUP_SECOND_RETENTION = 86400  # per-second totals for a day, per-minute after that
+ROLLUP_SECOND_SLACK = 3600  # extra seconds in the ring in case compaction falls behind
+ROLLUP_FOLD_SECONDS = 3600  # max seconds folded into minutes per compaction step
+ROLLUP_COMPACT_INTERVAL = 10  # seconds between background compaction steps
+ROLLING_HISTOGRAM_REFRESH_SECONDS = 2  # graph seconds re-read every frame besides the new ones
+ACTION_KINDS = ['keyboard', 'mouse_click']
+# Index 0 marks an action that did not count towards eAPM
+ACTION_CATEGORIES = [
+    'none', 'default', 'control_group', 'build', 'train', 'research',
+    'attack', 'move', 'camera', 'select', 'ability'
+]
+
 # Graph Settings
 GRAPH_TIME_RANGE_OPTIONS = [30, 60, 120, 300]  # seconds
+GRAPH_BACKEND_OPTIONS = ['matplotlib', 'canvas']
+DEFAULT_GRAPH_BACKEND = 'matplotlib'
 
 # Logging Levels
 LOG_LEVELS = ['DEBUG', 'INFO', 'WARNING', 'ERROR', 'CRITICAL']
 
 # File Paths
+EAPM_RULES_FILE = 'eapm_rules.yaml'  # read from the same directory as settings.yaml
+SESSION_DB_FILE = 'apm_sessions.db'  # SQLite session catalog, next to settings.yaml
 FONT_FILENAME = 'IosevkaTermNerdFont-Regular.ttf'
 FONT_PATH = 'assets/fonts/IosevkaTermNerdFont-Regular.ttf'
 FONT_NAME= 'IosevkaTerm NF'
@@ -63,3 +104,44 @@ MINI_WINDOW_LABEL_COLOR = '#D8DEE9'
 
 # Input Manager Constants
 INPUT_EVENT_WAIT_TIME = 1  # second
+INPUT_QUEUE_SIZE = 4096  # events buffered between the hooks and DataManager
+INPUT_BATCH_SIZE = 256  # max events recorded per lock acquisition
+
+KEY_CODE_COUNT = 512  # size of the key code lookup tables
+
+# Metrics Constants
+DEFAULT_LATENCY_BUCKETS = (
+    0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005,
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1
+)  # seconds
+FRAME_LATENCY_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0
+)  # seconds, for GUI ticks, graph frames and window checks
+METRICS_HOST = '127.0.0.1'
+DEFAULT_METRICS_PORT = 9464
+
+# Interval Sketch Constants
+INTERVAL_SKETCH_SUB_BITS = 7  # 128 buckets per power of two, under 1% relative error
+INTERVAL_SKETCH_MAX_SECONDS = 3600  # longer intervals are counted in the top bucket
+INTERVAL_QUANTILES = [0.5, 0.95, 0.99]
+
+# Session Catalog Constants
+SESSION_DB_FLUSH_INTERVAL = 1.0  # seconds between catalog writes
+SESSION_DB_BATCH_ROWS = 50000  # max actions inserted per transaction
+
+# Headless Mode Constants
+HEADLESS_STATS_INTERVAL = 1.0  # seconds between JSON stats lines
+
+# Overlay Server Constants
+OVERLAY_HOST = '127.0.0.1'  # local only, OBS browser sources run on the same machine
+DEFAULT_OVERLAY_PORT = 8765
+DEFAULT_OVERLAY_PUSH_RATE = 4  # WebSocket updates per second
+MAX_OVERLAY_PUSH_RATE = 30
+OVERLAY_REQUEST_TIMEOUT = 5.0  # seconds to wait for request headers
+OVERLAY_MAX_FRAME = 1 << 16  # largest WebSocket frame accepted from a client
+
+# Shared Memory Stats Constants
+SHARED_STATS_NAME = 'apm_tracker_stats'
+SHARED_STATS_INTERVAL = 0.05  # seconds between publishes
+SHARED_STATS_HISTOGRAM_SECONDS = 60
+SHARED_STATS_LIVENESS_INTERVALS = 4  # an existing block whose sequence does not move for this many publishes is stale
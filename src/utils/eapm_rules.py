@@ -0,0 +1,143 @@
+import copy
+import logging
+import yaml
+from utils.key_codes import key_to_code, UNKNOWN_KEY
+from utils.constants import ACTION_CATEGORIES, KEY_CODE_COUNT
+
+# Patterns are matched against the last three actions, starting at the
+# oldest one. A pattern token is a hotkey group name, 'mouse_click', or a
+# list of either meaning "any of these".
+DEFAULT_EAPM_RULES = {
+    'sequences': [
+        {'pattern': [['control', 'shift'], 'numbers'], 'category': 'control_group'},
+        {'pattern': ['numbers', 'mouse_click'], 'category': 'control_group'},
+        {'pattern': [['letters', 'f_keys'], 'mouse_click'], 'category': 'build'},
+        {'pattern': ['shift', 'mouse_click'], 'category': 'move'},
+        {'pattern': ['control', 'f_keys'], 'category': 'camera'},
+    ],
+    'actions': {
+        'mouse_click': 'default',
+        'numbers': 'control_group',
+        'letters': 'ability',
+        'f_keys': 'ability',
+    },
+}
+
+SEQUENCE_WINDOW = 3
+EMPTY_CLASS = 0  # Placeholder for history slots before any action arrived
+
+class EapmRules:
+    """
+    eAPM sequence and action rules compiled into flat lookup tables.
+
+    Every action is reduced to an interned key-class ID (its hotkey group,
+    'mouse_click' or 'other') through a table indexed by key code. The last three class IDs index a single
+    table of category IDs, so classifying an event is a couple of integer
+    operations and one list lookup, whatever the number of rules.
+    """
+
+    def __init__(self, hotkey_groups, rules=None):
+        self.rules = copy.deepcopy(rules if rules is not None else DEFAULT_EAPM_RULES)
+        self.class_names = ['empty', 'other', 'mouse_click'] + list(hotkey_groups)
+        self.class_ids = {name: i for i, name in enumerate(self.class_names)}
+        self.class_count = len(self.class_names)
+        self.other_class = self.class_ids['other']
+        self.mouse_class = self.class_ids['mouse_click']
+
+        # Key code -> class ID, the first group containing a key wins
+        self.class_by_code = [self.other_class] * KEY_CODE_COUNT
+        for group, keys in reversed(list(hotkey_groups.items())):
+            for key in keys:
+                code = key_to_code(key)
+                if code != UNKNOWN_KEY:
+                    self.class_by_code[code] = self.class_ids[group]
+
+        self.category_ids = {name: i for i, name in enumerate(ACTION_CATEGORIES)}
+        self.compile()
+        self.reset()
+
+    def compile(self):
+        if not isinstance(self.rules, dict):
+            raise ValueError("eAPM rules must be a mapping with 'sequences' and 'actions'")
+        sequences = self.rules.get('sequences', [])
+        actions = self.rules.get('actions', {})
+        if not isinstance(sequences, list) or not all(isinstance(rule, dict) for rule in sequences):
+            raise ValueError("eAPM rules 'sequences' must be a list of pattern/category rules")
+        if not isinstance(actions, dict):
+            raise ValueError("eAPM rules 'actions' must map key classes to categories")
+
+        n = self.class_count
+        self.sequence_table = [0] * (n ** SEQUENCE_WINDOW)
+        # Earlier rules win, so fill in reverse order and let them overwrite
+        for rule in reversed(sequences):
+            pattern = [self._token_classes(token) for token in rule['pattern']]
+            if not 1 <= len(pattern) <= SEQUENCE_WINDOW:
+                raise ValueError(f"Sequence pattern must have 1 to {SEQUENCE_WINDOW} steps: {rule['pattern']}")
+            category = self._category_id(rule['category'])
+            # Positions the pattern does not cover match any class
+            pattern += [range(1, n)] * (SEQUENCE_WINDOW - len(pattern))
+            for c0 in pattern[0]:
+                for c1 in pattern[1]:
+                    for c2 in pattern[2]:
+                        self.sequence_table[(c0 * n + c1) * n + c2] = category
+
+        self.action_table = [0] * n
+        for token, category in actions.items():
+            for class_id in self._token_classes(token):
+                self.action_table[class_id] = self._category_id(category)
+
+    def _token_classes(self, token):
+        names = token if isinstance(token, list) else [token]
+        classes = []
+        for name in names:
+            if name not in self.class_ids or name == 'empty':
+                raise ValueError(f"Unknown key class in eAPM rules: {name}")
+            classes.append(self.class_ids[name])
+        return classes
+
+    def _category_id(self, name):
+        if name not in self.category_ids or name == 'none':
+            raise ValueError(f"Unknown eAPM category: {name}")
+        return self.category_ids[name]
+
+    def reset(self):
+        self.second_last = EMPTY_CLASS
+        self.last = EMPTY_CLASS
+
+    def class_id(self, action_type, key_code):
+        if action_type == 'mouse_click':
+            return self.mouse_class
+        return self.class_by_code[key_code]
+
+    def push(self, class_id):
+        """
+        Add an action to the history and return its (sequence category,
+        action category) IDs, where 0 means no rule matched.
+        """
+        n = self.class_count
+        sequence = self.sequence_table[(self.second_last * n + self.last) * n + class_id]
+        self.second_last = self.last
+        self.last = class_id
+        return sequence, self.action_table[class_id]
+
+    @classmethod
+    def load(cls, hotkey_groups, filename):
+        try:
+            with open(filename, 'r') as f:
+                rules = yaml.safe_load(f)
+            engine = cls(hotkey_groups, rules)
+            logging.info(f"eAPM rules loaded from {filename}")
+            return engine
+        except FileNotFoundError:
+            logging.info("eAPM rules file not found. Using defaults.")
+        except (yaml.YAMLError, AttributeError, KeyError, TypeError, ValueError) as e:
+            logging.error(f"Error in eAPM rules file, using defaults: {e}")
+        return cls(hotkey_groups)
+
+    def save(self, filename):
+        try:
+            with open(filename, 'w') as f:
+                yaml.dump(self.rules, f, default_flow_style=None, sort_keys=False)
+            logging.info(f"eAPM rules saved to {filename}")
+        except IOError as e:
+            logging.error(f"Error saving eAPM rules: {e}")
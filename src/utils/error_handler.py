@@ -1,14 +1,24 @@
 import logging
 import traceback
-import tkinter as tk
-from tkinter import messagebox
+
+# Headless mode turns dialogs off, errors are only logged there
+error_dialogs_enabled = True
 
 class APMTrackerError(Exception):
     """Base exception class for APM Tracker"""
     pass
 
+def disable_error_dialogs():
+    global error_dialogs_enabled
+    error_dialogs_enabled = False
+
 def show_error_dialog(title, message):
     """Display an error dialog to the user"""
+    if not error_dialogs_enabled:
+        return
+    # Imported here so headless mode never loads tkinter
+    import tkinter as tk
+    from tkinter import messagebox
     root = tk.Tk()
     root.withdraw()  # Hide the main window
     messagebox.showerror(title, message)
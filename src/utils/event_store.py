@@ -0,0 +1,278 @@
+import datetime
+import logging
+import os
+import shutil
+import tempfile
+from collections import namedtuple
+import numpy as np
+from utils.constants import (
+    EVENT_STORE_INITIAL_CAPACITY, EVENT_STORE_HOT_SECONDS, EVENT_STORE_SEGMENT_ROWS
+)
+
+COLUMNS = (
+    ('timestamps', np.float64),
+    ('weights', np.float32),
+    ('categories', np.uint8),
+    ('kinds', np.uint8),
+    ('keys', np.uint16),
+)
+
+EventColumns = namedtuple('EventColumns', [name for name, _ in COLUMNS])
+
+def empty_columns():
+    return EventColumns(*(np.empty(0, dtype=dtype) for _, dtype in COLUMNS))
+
+def concat_columns(chunks):
+    chunks = list(chunks)
+    if not chunks:
+        return empty_columns()
+    if len(chunks) == 1:
+        return chunks[0]
+    return EventColumns(*(np.concatenate(column) for column in zip(*chunks)))
+
+def slice_columns(columns, start, stop):
+    return EventColumns(*(column[start:stop] for column in columns))
+
+def save_columns(filename, columns, store_keys=False):
+    """Save columns as a .npz file. The keys are left out unless ``store_keys`` is set."""
+    arrays = columns._asdict()
+    if not store_keys:
+        del arrays['keys']
+    np.savez(filename, **arrays)
+
+def load_columns(filename):
+    with np.load(filename) as data:
+        # Files saved without keys read back with every key unknown (0)
+        count = len(data['timestamps'])
+        return EventColumns(*(data[name].astype(dtype, copy=False) if name in data.files
+                              else np.zeros(count, dtype=dtype) for name, dtype in COLUMNS))
+
+class Segment:
+    """
+    A fixed-size block of spilled events on disk. Columns are laid out one
+    after another in the file, so each one can be memory-mapped on its own.
+    """
+
+    def __init__(self, path, rows, first_timestamp, last_timestamp):
+        self.path = path
+        self.rows = rows
+        self.first_timestamp = first_timestamp
+        self.last_timestamp = last_timestamp
+        self._columns = None
+
+    @classmethod
+    def write(cls, path, columns):
+        with open(path, 'wb') as f:
+            for column in columns:
+                column.tofile(f)
+        timestamps = columns.timestamps
+        return cls(path, len(timestamps), float(timestamps[0]), float(timestamps[-1]))
+
+    def columns(self):
+        # Mapped once and kept, so readers holding this segment can still use
+        # it after the store has dropped it and removed the file
+        if self._columns is None:
+            self._columns = self._map()
+        return self._columns
+
+    def _map(self):
+        offset = 0
+        mapped = []
+        for _, dtype in COLUMNS:
+            mapped.append(np.memmap(self.path, dtype=dtype, mode='r', offset=offset, shape=(self.rows,)))
+            offset += self.rows * np.dtype(dtype).itemsize
+        return EventColumns(*mapped)
+
+class EventStore:
+    """
+    Columnar, append-only store for recorded actions, tiered by age.
+
+    Recent events live in preallocated NumPy columns (the hot tier) that
+    double in size when full. Once the hot tier holds more than a segment's
+    worth of events older than ``hot_seconds``, the oldest block is written
+    to a fixed-size segment file and read back later through ``np.memmap``,
+    so resident memory stays flat while the full session remains queryable.
+
+    The store does no locking of its own. Readers should call ``select`` or
+    ``snapshot`` while holding the owner's lock: both copy the hot rows they
+    need and return segments that never change once written, so the result
+    can be used after the lock is released.
+    """
+
+    def __init__(self, capacity=EVENT_STORE_INITIAL_CAPACITY, hot_seconds=EVENT_STORE_HOT_SECONDS,
+                 segment_rows=EVENT_STORE_SEGMENT_ROWS, segment_dir=None):
+        self.hot_seconds = hot_seconds
+        self.segment_rows = segment_rows
+        self.segment_dir = segment_dir
+        self._owns_segment_dir = False
+        self.segments = []
+        self.spilled_rows = 0
+        self.dropped_segments = 0
+        self.hot_size = 0
+        self._hot = [np.empty(max(capacity, 1), dtype=dtype) for _, dtype in COLUMNS]
+
+    def __len__(self):
+        return self.spilled_rows + self.hot_size
+
+    def append(self, timestamp, kind, key, category, weight):
+        timestamps = self._hot[0]
+        if self.hot_size == len(timestamps):
+            self._grow()
+            timestamps = self._hot[0]
+        i = self.hot_size
+        timestamps[i] = timestamp
+        self._hot[1][i] = weight
+        self._hot[2][i] = category
+        self._hot[3][i] = kind
+        self._hot[4][i] = key
+        self.hot_size = i + 1
+
+        # Spill once a whole segment has aged out of the hot window
+        if self.hot_size > self.segment_rows and \
+                timestamps[self.segment_rows - 1] < timestamp - self.hot_seconds:
+            self._spill()
+
+    def _grow(self):
+        capacity = len(self._hot[0]) * 2
+        for i, old in enumerate(self._hot):
+            new = np.empty(capacity, dtype=old.dtype)
+            new[:self.hot_size] = old[:self.hot_size]
+            self._hot[i] = new
+
+    def _spill(self):
+        rows = self.segment_rows
+        if self.segment_dir is None:
+            self.segment_dir = tempfile.mkdtemp(prefix='apm_segments_')
+            self._owns_segment_dir = True
+        path = os.path.join(self.segment_dir, f"segment_{self.dropped_segments + len(self.segments):06d}.bin")
+        try:
+            segment = Segment.write(path, EventColumns(*(column[:rows] for column in self._hot)))
+        except OSError as e:
+            # Keep everything in RAM rather than lose events
+            logging.error(f"Error spilling events to {path}: {e}")
+            self.hot_seconds = float('inf')
+            return
+
+        remaining = self.hot_size - rows
+        for column in self._hot:
+            column[:remaining] = column[rows:self.hot_size]
+        self.segments.append(segment)
+        self.spilled_rows += rows
+        self.hot_size = remaining
+        logging.debug(f"Spilled {rows} events to {path}")
+
+    @property
+    def first_row(self):
+        """Global index of the oldest row still held, after older segments were dropped."""
+        return self.dropped_segments * self.segment_rows
+
+    def drop_before(self, timestamp, row_limit=None):
+        """
+        Drop whole segments older than ``timestamp``, and only ones that end
+        at or before global row ``row_limit`` when it is given.
+        """
+        dropped = 0
+        while self.segments and self.segments[0].last_timestamp < timestamp:
+            if row_limit is not None and self.first_row + self.segment_rows > row_limit:
+                break
+            segment = self.segments.pop(0)
+            segment.columns()
+            try:
+                os.remove(segment.path)
+            except OSError:
+                pass  # Still mapped on Windows, removed with the directory on close
+            self.dropped_segments += 1
+            dropped += 1
+        return dropped
+
+    @property
+    def hot(self):
+        """Views over the hot tier. Only valid while the owner's lock is held."""
+        return EventColumns(*(column[:self.hot_size] for column in self._hot))
+
+    def snapshot(self):
+        """Segments plus a copy of the hot tier, safe to read without the lock."""
+        return list(self.segments), EventColumns(*(column.copy() for column in self.hot))
+
+    def select(self, start_time=None, end_time=None):
+        """Concatenated columns for events with start_time <= t < end_time."""
+        return concat_columns(self._chunks(self.segments, self.hot, start_time, end_time, copy_hot=True))
+
+    def rows_from(self, start, limit=None):
+        """Copy of up to ``limit`` rows from global row index ``start`` on, oldest first."""
+        stop = len(self) if limit is None else min(start + limit, len(self))
+        chunks = []
+        start = max(start, self.first_row)
+        for i in range(start // self.segment_rows - self.dropped_segments, len(self.segments)):
+            first = (i + self.dropped_segments) * self.segment_rows
+            if first >= stop:
+                break
+            columns = self.segments[i].columns()
+            chunks.append(slice_columns(columns, max(start - first, 0), min(stop - first, self.segment_rows)))
+        if stop > self.spilled_rows:
+            hot_start = max(start - self.spilled_rows, 0)
+            chunks.append(slice_columns(self.hot, hot_start, stop - self.spilled_rows))
+        return EventColumns(*(np.array(column) for column in concat_columns(chunks)))
+
+    def chunks(self, start_time=None, end_time=None, snapshot=None):
+        """Yield per-segment column blocks, oldest first, from a snapshot."""
+        segments, hot = snapshot if snapshot is not None else self.snapshot()
+        return self._chunks(segments, hot, start_time, end_time)
+
+    @staticmethod
+    def _chunks(segments, hot, start_time, end_time, copy_hot=False):
+        for segment in segments:
+            if start_time is not None and segment.last_timestamp < start_time:
+                continue
+            if end_time is not None and segment.first_timestamp >= end_time:
+                break
+            columns = _clip(segment.columns(), start_time, end_time)
+            if len(columns.timestamps):
+                yield columns
+        columns = _clip(hot, start_time, end_time)
+        if len(columns.timestamps):
+            yield EventColumns(*(column.copy() for column in columns)) if copy_hot else columns
+
+    def close(self):
+        self.segments = []
+        if self._owns_segment_dir and self.segment_dir:
+            shutil.rmtree(self.segment_dir, ignore_errors=True)
+            self.segment_dir = None
+            self._owns_segment_dir = False
+
+    @staticmethod
+    def to_utc(timestamp):
+        return datetime.datetime.fromtimestamp(float(timestamp), datetime.timezone.utc)
+
+_MILLISECONDS = [f"{i:03d}" for i in range(1000)]
+
+def format_utc_timestamps(timestamps):
+    """
+    ISO 8601 UTC strings with millisecond precision, the same as
+    to_utc(t).strftime('%Y-%m-%dT%H:%M:%S.%f')[:-3] + 'Z'. The sub-second
+    part is computed with integer arithmetic on the whole array and the
+    date and time prefix is only formatted once per second.
+    """
+    fractions, seconds = np.modf(timestamps)
+    micros = np.round(fractions * 1e6).astype(np.int64)  # Half-even, like datetime
+    seconds = seconds.astype(np.int64) + (micros >= 1000000)
+    millis = (micros % 1000000) // 1000
+
+    formatted = []
+    append = formatted.append
+    last_second = None
+    prefix = ''
+    for second, milli in zip(seconds.tolist(), millis.tolist()):
+        if second != last_second:
+            prefix = datetime.datetime.fromtimestamp(second, datetime.timezone.utc).strftime('%Y-%m-%dT%H:%M:%S.')
+            last_second = second
+        append(prefix + _MILLISECONDS[milli] + 'Z')
+    return formatted
+
+def _clip(columns, start_time, end_time):
+    timestamps = columns.timestamps
+    start = 0 if start_time is None else np.searchsorted(timestamps, start_time, side='left')
+    stop = len(timestamps) if end_time is None else np.searchsorted(timestamps, end_time, side='left')
+    if start == 0 and stop == len(timestamps):
+        return columns
+    return slice_columns(columns, start, stop)
@@ -1,29 +1,61 @@
-import threading
-from pynput import keyboard, mouse
-import psutil
+import queue
 import logging
 import time
 import os
 import subprocess
-from utils.constants import INPUT_EVENT_WAIT_TIME
+from utils.metrics import REGISTRY
+from utils.key_codes import key_to_code
+from utils.constants import INPUT_EVENT_WAIT_TIME, INPUT_QUEUE_SIZE, INPUT_BATCH_SIZE, FRAME_LATENCY_BUCKETS
 
 class InputManager:
     def __init__(self, tracker):
         self.tracker = tracker
-        self.input_event = threading.Event()
+        self.clock = tracker.clock
+        # Hook callbacks only enqueue (timestamp, kind, key, target active) records here
+        self.event_queue = queue.Queue(maxsize=INPUT_QUEUE_SIZE)
+        self.dropped_events = 0
+        self.callback_latency = None  # Histogram of hook callback time, see enable_metrics
+        self.active_check_latency = REGISTRY.histogram(
+            'apm_active_window_check_seconds', 'Time to check whether the target program is active',
+            FRAME_LATENCY_BUCKETS)
+        REGISTRY.gauge('apm_input_queue_depth', 'Input events waiting between the hooks and DataManager',
+                       self.queue_depth)
+        REGISTRY.counter('apm_dropped_events', 'Input events dropped because the queue was full',
+                         lambda: self.dropped_events)
         self.last_key = None
         self.last_active_check = 0
         self.last_active_state = True
         self.active_check_interval = 1.0  # Check active window every 1 second
 
+    def enable_metrics(self, registry=REGISTRY):
+        """Time every hook callback. Off by default, like DataManager.enable_metrics."""
+        self.callback_latency = registry.histogram('apm_hook_callback_seconds', 'Time spent in input hook callbacks')
+
+    def enqueue_event(self, kind, key=None):
+        latency = self.callback_latency
+        start = time.perf_counter() if latency else 0
+        # The focus state is the one last seen by the consumer, so the hook
+        # never waits on the active window check
+        try:
+            self.event_queue.put_nowait((self.clock.time(), kind, key, self.last_active_state))
+        except queue.Full:
+            self.dropped_events += 1
+        if latency:
+            latency.observe(time.perf_counter() - start)
+
+    def queue_depth(self):
+        return self.event_queue.qsize()
+
     def input_loop(self):
+        # Imported on the input thread so installing the hooks stays off the startup path
+        from pynput import keyboard, mouse
+
         def on_press(key):
-            if self.is_target_program_active():
-                self.tracker.on_action('keyboard')
+            self.enqueue_event('keyboard', key)
 
         def on_click(x, y, button, pressed):
-            if pressed and self.is_target_program_active():
-                self.tracker.on_action('mouse_click')
+            if pressed:
+                self.enqueue_event('mouse_click')
 
         keyboard_listener = keyboard.Listener(on_press=on_press)
         mouse_listener = mouse.Listener(on_click=on_click)
@@ -31,15 +63,45 @@ class InputManager:
         keyboard_listener.start()
         mouse_listener.start()
 
+        try:
+            self.consume_events()
+        finally:
+            keyboard_listener.stop()
+            mouse_listener.stop()
+
+    def consume_events(self):
         while self.tracker.running:
-            self.input_event.wait(INPUT_EVENT_WAIT_TIME)
-            self.input_event.clear()
+            # Kept current while idle too, so events carry the focus at the
+            # time they happened, at most one check interval old
+            self.is_target_program_active()
+            try:
+                event = self.event_queue.get(timeout=min(INPUT_EVENT_WAIT_TIME, self.active_check_interval))
+            except queue.Empty:
+                continue
+            if event is None:
+                continue  # Wake-up sentinel from stop()
+
+            batch = [event]
+            while len(batch) < INPUT_BATCH_SIZE:
+                try:
+                    event = self.event_queue.get_nowait()
+                except queue.Empty:
+                    break
+                if event is not None:
+                    batch.append(event)
 
-        keyboard_listener.stop()
-        mouse_listener.stop()
+            events = [(timestamp, kind, key_to_code(key)) for timestamp, kind, key, active in batch if active]
+            if events:
+                self.tracker.on_actions(events)
+
+    def stop(self):
+        try:
+            self.event_queue.put_nowait(None)
+        except queue.Full:
+            pass  # The consumer is busy and will see running == False
 
     def is_target_program_active(self):
-        current_time = time.time()
+        current_time = self.clock.time()
         if current_time - self.last_active_check < self.active_check_interval:
             return self.last_active_state
 
@@ -48,6 +110,7 @@ class InputManager:
             self.last_active_state = True
             return True
 
+        start = time.perf_counter()
         try:
             if os.name == 'nt':  # Windows
                 self.last_active_state = self._check_active_window_windows()
@@ -61,8 +124,11 @@ class InputManager:
             logging.error(f"Error checking active window: {e}")
             self.last_active_state = False
             return False
+        finally:
+            self.active_check_latency.observe(time.perf_counter() - start)
 
     def _check_active_window_windows(self):
+        import psutil
         import win32gui
         import win32process
         hwnd = win32gui.GetForegroundWindow()
@@ -0,0 +1,120 @@
+import json
+import numpy as np
+from utils.constants import INTERVAL_SKETCH_SUB_BITS, INTERVAL_SKETCH_MAX_SECONDS
+
+class IntervalSketch:
+    """
+    Log-linear (HDR-style) histogram of intervals in seconds.
+
+    Intervals are recorded as whole microseconds. Values below
+    2 * 2**sub_bits are counted exactly; above that every power of two is
+    split into 2**sub_bits buckets, so a quantile is within 1 / 2**sub_bits
+    of the true value (under 1% with the default 7 bits) and memory is fixed
+    by the range, not by how many intervals were recorded. Sketches with the
+    same layout are merged by adding their bucket counts.
+    """
+
+    def __init__(self, sub_bits=INTERVAL_SKETCH_SUB_BITS, max_seconds=INTERVAL_SKETCH_MAX_SECONDS):
+        self.sub_bits = sub_bits
+        self.sub_count = 1 << sub_bits
+        self.max_value = int(max_seconds * 1e6)
+        self.counts = [0] * (self._index(self.max_value) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def _index(self, value):
+        shift = value.bit_length() - self.sub_bits - 1
+        if shift <= 0:
+            return value
+        return shift * self.sub_count + (value >> shift)
+
+    def _value(self, index):
+        """Midpoint of a bucket in microseconds."""
+        if index < 2 * self.sub_count:
+            return index
+        shift = index // self.sub_count - 1
+        lower = (index - shift * self.sub_count) << shift
+        return lower + (1 << shift) / 2
+
+    def add(self, seconds):
+        value = int(seconds * 1e6)
+        if value > self.max_value:
+            value = self.max_value
+        elif value < 0:
+            return
+        # Same as _index, inlined for the recording path
+        shift = value.bit_length() - self.sub_bits - 1
+        self.counts[shift * self.sub_count + (value >> shift) if shift > 0 else value] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def merge(self, other):
+        if len(other.counts) != len(self.counts) or other.sub_bits != self.sub_bits:
+            raise ValueError("Cannot merge interval sketches with different layouts")
+        self.counts = [a + b for a, b in zip(self.counts, other.counts)]
+        self.count += other.count
+        self.total += other.total
+        self.max = max(self.max, other.max)
+        return self
+
+    def copy(self):
+        sketch = IntervalSketch.__new__(IntervalSketch)
+        sketch.__dict__.update(self.__dict__)
+        sketch.counts = list(self.counts)
+        return sketch
+
+    def quantiles(self, qs):
+        """Interval in seconds at each quantile in ``qs`` (0-1), None when empty."""
+        if not self.count:
+            return [None] * len(qs)
+        cumulative = np.cumsum(self.counts)
+        ranks = [max(int(np.ceil(q * self.count)), 1) for q in qs]
+        indices = np.searchsorted(cumulative, ranks)
+        return [min(self._value(int(i)) / 1e6, self.max) for i in indices]
+
+    def quantile(self, q):
+        return self.quantiles([q])[0]
+
+    def mean(self):
+        return self.total / self.count if self.count else None
+
+    def to_dict(self):
+        return {
+            'sub_bits': self.sub_bits,
+            'max_value': self.max_value,
+            'count': self.count,
+            'total': self.total,
+            'max': self.max,
+            # Sparse (index, count) pairs, most buckets are empty
+            'buckets': [[i, c] for i, c in enumerate(self.counts) if c],
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        sketch = cls(data['sub_bits'], data['max_value'] / 1e6)
+        for index, count in data['buckets']:
+            sketch.counts[index] = count
+        sketch.count = data['count']
+        sketch.total = data['total']
+        sketch.max = data['max']
+        return sketch
+
+def merge_sketches(target, other):
+    """Merge a dict of named sketches into ``target`` in place."""
+    for name, sketch in other.items():
+        if name in target:
+            target[name].merge(sketch)
+        else:
+            target[name] = sketch.copy()
+    return target
+
+def save_sketches(filename, sketches):
+    with open(filename, 'w') as f:
+        json.dump({name: sketch.to_dict() for name, sketch in sketches.items()}, f)
+
+def load_sketches(filename):
+    with open(filename) as f:
+        return {name: IntervalSketch.from_dict(data) for name, data in json.load(f).items()}
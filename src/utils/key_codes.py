@@ -0,0 +1,79 @@
+from utils.constants import KEY_CODE_COUNT
+
+# Codes below 256 are the lowercased character itself, named keys follow.
+# Left/right variants of modifiers share one code.
+SPECIAL_KEY_NAMES = [
+    'ctrl', 'shift', 'alt', 'cmd', 'space', 'tab', 'enter', 'esc', 'backspace',
+    'delete', 'insert', 'home', 'end', 'page_up', 'page_down', 'up', 'down',
+    'left', 'right', 'caps_lock', 'num_lock', 'scroll_lock', 'print_screen',
+    'pause', 'menu',
+] + [f'f{i}' for i in range(1, 25)]
+
+UNKNOWN_KEY = 0
+SPECIAL_KEY_OFFSET = 256
+
+KEY_NAMES = [''] * KEY_CODE_COUNT
+for _code in range(32, SPECIAL_KEY_OFFSET):
+    KEY_NAMES[_code] = chr(_code)
+for _i, _name in enumerate(SPECIAL_KEY_NAMES):
+    KEY_NAMES[SPECIAL_KEY_OFFSET + _i] = _name
+
+KEY_NAME_CODES = {name: code for code, name in enumerate(KEY_NAMES) if name}
+
+_NAME_ALIASES = {
+    'ctrl_l': 'ctrl', 'ctrl_r': 'ctrl',
+    'shift_l': 'shift', 'shift_r': 'shift',
+    'alt_l': 'alt', 'alt_r': 'alt', 'alt_gr': 'alt',
+    'cmd_l': 'cmd', 'cmd_r': 'cmd',
+}
+
+def key_to_code(key):
+    """
+    Map a pynput key (or a key name string) to a small integer code.
+
+    pynput hands out ``Key`` enum members for named keys and ``KeyCode``
+    objects with a ``char`` and ``vk`` for everything else. With Ctrl held,
+    ``char`` is a control character on Windows, so letters and digits fall
+    back to the virtual key code.
+    """
+    if key is None:
+        return UNKNOWN_KEY
+    if isinstance(key, int):
+        return key if 0 <= key < KEY_CODE_COUNT else UNKNOWN_KEY
+    if isinstance(key, str):
+        return _char_or_name_code(key)
+
+    name = getattr(key, 'name', None)
+    if name is not None:
+        return KEY_NAME_CODES.get(_NAME_ALIASES.get(name, name), UNKNOWN_KEY)
+
+    char = getattr(key, 'char', None)
+    if char is not None and len(char) == 1 and ord(char) >= 32:
+        return _char_or_name_code(char)
+    vk = getattr(key, 'vk', None)
+    if vk is not None and (48 <= vk <= 57 or 65 <= vk <= 90):
+        return ord(chr(vk).lower())
+    return UNKNOWN_KEY
+
+def _char_or_name_code(name):
+    if len(name) == 1:
+        code = ord(name.lower())
+        return code if code < SPECIAL_KEY_OFFSET else UNKNOWN_KEY
+    name = name.lower()
+    return KEY_NAME_CODES.get(_NAME_ALIASES.get(name, name), UNKNOWN_KEY)
+
+def build_group_masks(hotkey_groups):
+    """
+    Precompute a bitmask of hotkey groups for every key code.
+
+    Returns ``(group_bits, masks)`` where ``group_bits`` maps a group name to
+    its bit and ``masks[code] & group_bits[group]`` tests membership.
+    """
+    group_bits = {group: 1 << i for i, group in enumerate(hotkey_groups)}
+    masks = [0] * KEY_CODE_COUNT
+    for group, keys in hotkey_groups.items():
+        for key in keys:
+            code = key_to_code(key)
+            if code != UNKNOWN_KEY:
+                masks[code] |= group_bits[group]
+    return group_bits, masks
@@ -0,0 +1,168 @@
+import threading
+from bisect import bisect_left
+from utils.constants import DEFAULT_LATENCY_BUCKETS
+
+def format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+class Histogram:
+    """
+    Fixed-bucket histogram for latencies in seconds. Observations only take
+    a short uncontended lock, so it is cheap enough for the input hooks.
+    """
+
+    def __init__(self, name, description, buckets=DEFAULT_LATENCY_BUCKETS):
+        self.name = name
+        self.description = description
+        self.buckets = tuple(buckets)
+        self.bucket_counts = [0] * (len(self.buckets) + 1)  # Last slot is +Inf
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            self.bucket_counts[index] += 1
+            self.count += 1
+            self.sum += value
+            if value > self.max:
+                self.max = value
+
+    def snapshot(self):
+        with self._lock:
+            counts = list(self.bucket_counts)
+            count, total, maximum = self.count, self.sum, self.max
+        return {
+            'count': count,
+            'sum': total,
+            'max': maximum,
+            'mean': total / count if count else 0.0,
+            'buckets': list(zip(self.buckets + (float('inf'),), counts)),
+        }
+
+    def render(self):
+        snapshot = self.snapshot()
+        lines = [f"# TYPE {self.name} histogram", f"# HELP {self.name} {self.description}"]
+        cumulative = 0
+        for bound, count in snapshot['buckets']:
+            cumulative += count
+            lines.append(f'{self.name}_bucket{{le="{format_value(bound)}"}} {cumulative}')
+        lines.append(f"{self.name}_count {snapshot['count']}")
+        lines.append(f"{self.name}_sum {format_value(snapshot['sum'])}")
+        return lines
+
+class Counter:
+    """
+    Monotonic count. Either incremented with ``inc`` or, for counts the
+    owner already keeps, read from ``function`` when scraped.
+    """
+
+    def __init__(self, name, description, function=None):
+        self.name = name
+        self.description = description
+        self.function = function
+        self.value = 0
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1):
+        with self._lock:
+            self.value += amount
+
+    def get(self):
+        return self.function() if self.function else self.value
+
+    def render(self):
+        return [f"# TYPE {self.name} counter", f"# HELP {self.name} {self.description}",
+                f"{self.name}_total {format_value(self.get())}"]
+
+class Gauge:
+    """Value that goes up and down, set directly or read from ``function`` when scraped."""
+
+    def __init__(self, name, description, function=None):
+        self.name = name
+        self.description = description
+        self.function = function
+        self.value = 0
+
+    def set(self, value):
+        self.value = value
+
+    def get(self):
+        return self.function() if self.function else self.value
+
+    def render(self):
+        return [f"# TYPE {self.name} gauge", f"# HELP {self.name} {self.description}",
+                f"{self.name} {format_value(self.get())}"]
+
+class MetricsRegistry:
+    """
+    Named metrics rendered in the OpenMetrics text format. Getting a metric
+    that already exists returns it, so components can register theirs
+    without knowing who else has. Function-backed counters and gauges are
+    evaluated on the scraping thread.
+    """
+
+    def __init__(self):
+        self.metrics = {}
+        self._lock = threading.Lock()
+
+    def _get(self, cls, name, *args, **kwargs):
+        with self._lock:
+            metric = self.metrics.get(name)
+            if metric is None:
+                metric = self.metrics[name] = cls(name, *args, **kwargs)
+            elif not isinstance(metric, cls):
+                raise ValueError(f"Metric {name} is already registered as a {type(metric).__name__}")
+            elif kwargs.get('function'):
+                metric.function = kwargs['function']  # The newest owner wins
+            return metric
+
+    def histogram(self, name, description, buckets=DEFAULT_LATENCY_BUCKETS):
+        return self._get(Histogram, name, description, buckets)
+
+    def counter(self, name, description, function=None):
+        return self._get(Counter, name, description, function=function)
+
+    def gauge(self, name, description, function=None):
+        return self._get(Gauge, name, description, function=function)
+
+    def render(self):
+        with self._lock:
+            metrics = list(self.metrics.values())
+        lines = []
+        for metric in metrics:
+            try:
+                lines.extend(metric.render())
+            except Exception:
+                continue  # A failing callback should not break the whole scrape
+        lines.append('# EOF')
+        return '\n'.join(lines) + '\n'
+
+# Process-wide registry the components register into
+REGISTRY = MetricsRegistry()
+
+class CompensatedSum:
+    """
+    Running float sum with Neumaier compensation, so the total of millions
+    of small weights does not drift the way a plain ``+=`` does.
+    """
+
+    def __init__(self):
+        self.sum = 0.0
+        self.compensation = 0.0
+
+    def add(self, value):
+        total = self.sum + value
+        if abs(self.sum) >= abs(value):
+            self.compensation += (self.sum - total) + value
+        else:
+            self.compensation += (value - total) + self.sum
+        self.sum = total
+
+    @property
+    def value(self):
+        return self.sum + self.compensation
@@ -0,0 +1,50 @@
+import logging
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from utils.metrics import REGISTRY
+from utils.constants import METRICS_HOST, DEFAULT_METRICS_PORT
+
+OPENMETRICS_CONTENT_TYPE = 'application/openmetrics-text; version=1.0.0; charset=utf-8'
+
+def process_rss():
+    import psutil
+    return psutil.Process().memory_info().rss
+
+class MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split('?', 1)[0] != '/metrics':
+            self.send_error(404)
+            return
+        body = self.server.registry.render().encode()
+        self.send_response(200)
+        self.send_header('Content-Type', OPENMETRICS_CONTENT_TYPE)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        logging.debug(f"Metrics request: {format % args}")
+
+class MetricsServer:
+    """
+    Serves the metrics registry at /metrics for Prometheus or any
+    OpenMetrics scraper. Scrapes are handled on the server's own threads,
+    so they never wait on the input or Tk threads.
+    """
+
+    def __init__(self, registry=REGISTRY, host=METRICS_HOST, port=DEFAULT_METRICS_PORT):
+        self.registry = registry
+        registry.gauge('apm_process_resident_memory_bytes', 'Resident memory of the tracker process', process_rss)
+        self.server = ThreadingHTTPServer((host, port), MetricsHandler)
+        self.server.daemon_threads = True
+        self.server.registry = registry
+        self.host, self.port = self.server.server_address[:2]
+        self.thread = threading.Thread(target=self.server.serve_forever, name='MetricsServer', daemon=True)
+
+    def start(self):
+        self.thread.start()
+        logging.info(f"Serving metrics on http://{self.host}:{self.port}/metrics")
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
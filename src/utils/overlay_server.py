@@ -0,0 +1,280 @@
+import asyncio
+import base64
+import hashlib
+import json
+import logging
+import threading
+from utils.constants import (
+    OVERLAY_HOST, DEFAULT_OVERLAY_PORT, DEFAULT_OVERLAY_PUSH_RATE,
+    OVERLAY_REQUEST_TIMEOUT, OVERLAY_MAX_FRAME
+)
+
+WEBSOCKET_GUID = '258EAFA5-E914-47DA-95CA-C5AB0DC85B11'
+
+OPCODE_TEXT = 0x1
+OPCODE_CLOSE = 0x8
+OPCODE_PING = 0x9
+OPCODE_PONG = 0xA
+
+# Browser source page for OBS. The first message is the full snapshot and
+# later ones only carry the fields that changed, so the page merges them.
+OVERLAY_PAGE = """<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>APM Overlay</title>
+<style>
+  html, body { margin: 0; background: transparent; }
+  body { font: bold 28px 'Segoe UI', sans-serif; color: #fff; text-shadow: 0 0 4px #000, 0 0 2px #000; padding: 8px; }
+  .label { color: #ccc; font-size: 18px; margin-right: 6px; }
+  .row { white-space: nowrap; }
+  #windows { font-size: 16px; }
+</style>
+</head>
+<body>
+<div class="row"><span class="label">APM</span><span id="current_apm">-</span></div>
+<div class="row"><span class="label">eAPM</span><span id="current_eapm">-</span></div>
+<div class="row" id="windows"></div>
+<script>
+var stats = {};
+function render() {
+  document.getElementById('current_apm').textContent = stats.current_apm;
+  document.getElementById('current_eapm').textContent = stats.current_eapm;
+  var windows = stats.windows || {};
+  document.getElementById('windows').textContent = Object.keys(windows).map(function (seconds) {
+    return seconds + 's ' + windows[seconds].apm + '/' + windows[seconds].eapm;
+  }).join('  ');
+}
+function connect() {
+  var socket = new WebSocket('ws://' + location.host + '/ws');
+  socket.onmessage = function (event) {
+    Object.assign(stats, JSON.parse(event.data));
+    render();
+  };
+  socket.onclose = function () {
+    stats = {};
+    setTimeout(connect, 1000);
+  };
+}
+connect();
+</script>
+</body>
+</html>
+"""
+
+def websocket_accept(key):
+    return base64.b64encode(hashlib.sha1((key + WEBSOCKET_GUID).encode()).digest()).decode()
+
+def encode_frame(payload, opcode=OPCODE_TEXT):
+    """A single unmasked frame, as sent by a server."""
+    length = len(payload)
+    if length < 126:
+        header = bytes([0x80 | opcode, length])
+    elif length < 1 << 16:
+        header = bytes([0x80 | opcode, 126]) + length.to_bytes(2, 'big')
+    else:
+        header = bytes([0x80 | opcode, 127]) + length.to_bytes(8, 'big')
+    return header + payload
+
+async def read_frame(reader):
+    """(opcode, payload) of the next frame, unmasking client frames."""
+    first, second = await reader.readexactly(2)
+    length = second & 0x7F
+    if length == 126:
+        length = int.from_bytes(await reader.readexactly(2), 'big')
+    elif length == 127:
+        length = int.from_bytes(await reader.readexactly(8), 'big')
+    if length > OVERLAY_MAX_FRAME:
+        raise ValueError(f"WebSocket frame of {length} bytes is too large")
+    mask = await reader.readexactly(4) if second & 0x80 else None
+    payload = await reader.readexactly(length)
+    if mask:
+        payload = bytes(b ^ mask[i % 4] for i, b in enumerate(payload))
+    return first & 0x0F, payload
+
+class OverlayClient:
+    def __init__(self, writer):
+        self.writer = writer
+        self.closed = False
+        self.version = 0  # Last snapshot version sent
+        self.sent = {}
+
+class OverlayServer:
+    """
+    HTTP and WebSocket server for stream overlays, on its own asyncio loop
+    in a background thread so it never touches the Tk thread.
+
+    - ``/`` serves a browser-source page for OBS
+    - ``/stats`` returns the current stats as JSON
+    - ``/ws`` pushes the fields that changed since the last message
+
+    One producer samples ``get_snapshot`` ``push_rate`` times a second while
+    anyone is connected, and every client is sent the newest sample when its
+    previous send has drained. A slow client skips to the latest stats
+    instead of queueing old ones, and cannot hold up the others.
+    """
+
+    def __init__(self, get_snapshot, host=OVERLAY_HOST, port=DEFAULT_OVERLAY_PORT,
+                 push_rate=DEFAULT_OVERLAY_PUSH_RATE):
+        self.get_snapshot = get_snapshot
+        self.host = host
+        self.port = port
+        self.push_interval = 1 / push_rate
+        self.clients = set()
+        self.snapshot = None
+        self.version = 0
+        self.loop = None
+        self.changed = None
+        self.stopping = None
+        self.error = None
+        self.ready = threading.Event()
+        self.thread = threading.Thread(target=self.run, name='OverlayServer', daemon=True)
+
+    def start(self):
+        self.thread.start()
+        self.ready.wait()
+        if self.error:
+            raise self.error
+        logging.info(f"Overlay server listening on http://{self.host}:{self.port}/")
+
+    def run(self):
+        try:
+            asyncio.run(self.serve())
+        except Exception as e:
+            self.error = e
+            self.ready.set()
+
+    def stop(self):
+        if self.loop and self.stopping and not self.stopping.done():
+            self.loop.call_soon_threadsafe(self.stopping.set_result, None)
+        if self.thread.is_alive():
+            self.thread.join()
+
+    async def serve(self):
+        self.loop = asyncio.get_running_loop()
+        self.changed = asyncio.Condition()
+        self.stopping = self.loop.create_future()
+        server = await asyncio.start_server(self.handle_connection, self.host, self.port)
+        # Port 0 picks a free port, report the real one
+        self.port = server.sockets[0].getsockname()[1]
+        self.ready.set()
+        producer = asyncio.create_task(self.produce())
+        try:
+            await self.stopping
+        finally:
+            producer.cancel()
+            server.close()
+            for client in list(self.clients):
+                client.writer.write(encode_frame(b'', OPCODE_CLOSE))
+                client.writer.close()
+            await self.notify()
+            await server.wait_closed()
+
+    async def produce(self):
+        while True:
+            if self.clients:
+                try:
+                    # The snapshot takes the DataManager lock, keep it off the loop
+                    snapshot = await self.loop.run_in_executor(None, self.get_snapshot)
+                except Exception as e:
+                    logging.error(f"Error taking overlay snapshot: {e}")
+                else:
+                    self.snapshot = snapshot
+                    self.version += 1
+                    await self.notify()
+            await asyncio.sleep(self.push_interval)
+
+    async def notify(self):
+        async with self.changed:
+            self.changed.notify_all()
+
+    async def handle_connection(self, reader, writer):
+        try:
+            request = await asyncio.wait_for(reader.readuntil(b'\r\n\r\n'), OVERLAY_REQUEST_TIMEOUT)
+            lines = request.decode('latin-1').split('\r\n')
+            method, target, _ = lines[0].split(' ', 2)
+            headers = {}
+            for line in lines[1:]:
+                if ':' in line:
+                    name, value = line.split(':', 1)
+                    headers[name.strip().lower()] = value.strip()
+            path = target.split('?', 1)[0]
+
+            if method != 'GET':
+                await self.respond(writer, '405 Method Not Allowed', 'text/plain', b'Method Not Allowed')
+            elif path == '/ws' and headers.get('upgrade', '').lower() == 'websocket' and 'sec-websocket-key' in headers:
+                await self.websocket(reader, writer, headers['sec-websocket-key'])
+            elif path == '/stats':
+                snapshot = await self.loop.run_in_executor(None, self.get_snapshot)
+                await self.respond(writer, '200 OK', 'application/json', json.dumps(snapshot).encode())
+            elif path == '/':
+                await self.respond(writer, '200 OK', 'text/html; charset=utf-8', OVERLAY_PAGE.encode())
+            else:
+                await self.respond(writer, '404 Not Found', 'text/plain', b'Not Found')
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, asyncio.TimeoutError,
+                ConnectionError, ValueError):
+            pass
+        except Exception as e:
+            logging.error(f"Error in overlay connection: {e}")
+        finally:
+            writer.close()
+
+    async def respond(self, writer, status, content_type, body):
+        writer.write(
+            f"HTTP/1.1 {status}\r\n"
+            f"Content-Type: {content_type}\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            "Cache-Control: no-store\r\n"
+            "Access-Control-Allow-Origin: *\r\n"
+            "Connection: close\r\n\r\n".encode() + body)
+        await writer.drain()
+
+    async def websocket(self, reader, writer, key):
+        writer.write(
+            "HTTP/1.1 101 Switching Protocols\r\n"
+            "Upgrade: websocket\r\n"
+            "Connection: Upgrade\r\n"
+            f"Sec-WebSocket-Accept: {websocket_accept(key)}\r\n\r\n".encode())
+        await writer.drain()
+
+        client = OverlayClient(writer)
+        self.clients.add(client)
+        receiver = asyncio.create_task(self.receive(reader, client))
+        try:
+            await self.send_updates(client)
+        finally:
+            self.clients.discard(client)
+            receiver.cancel()
+
+    async def send_updates(self, client):
+        while not client.closed:
+            if client.version != self.version and self.snapshot is not None:
+                client.version = self.version
+                snapshot = self.snapshot
+                message = {name: value for name, value in snapshot.items() if client.sent.get(name) != value}
+                client.sent = snapshot
+                if message:
+                    client.writer.write(encode_frame(json.dumps(message).encode()))
+                    await client.writer.drain()
+                continue
+            async with self.changed:
+                await self.changed.wait_for(lambda: client.closed or client.version != self.version
+                                            or self.stopping.done())
+            if self.stopping.done():
+                return
+
+    async def receive(self, reader, client):
+        """Answer pings and close frames, the overlay never sends anything else."""
+        try:
+            while True:
+                opcode, payload = await read_frame(reader)
+                if opcode == OPCODE_CLOSE:
+                    client.writer.write(encode_frame(payload[:2], OPCODE_CLOSE))
+                    break
+                if opcode == OPCODE_PING:
+                    client.writer.write(encode_frame(payload, OPCODE_PONG))
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass
+        finally:
+            client.closed = True
+            await self.notify()
@@ -0,0 +1,77 @@
+import logging
+import time
+from utils.clock import ManualClock, ScaledClock
+from utils.data_manager import DataManager
+from utils.event_store import load_columns
+from utils.constants import ACTION_KINDS, INPUT_BATCH_SIZE
+
+class ReplayDriver:
+    """
+    Feed a recorded session through DataManager.record_actions.
+
+    ``speed`` is a real-time multiplier (1 for 1x, 10 for 10x) or None to
+    replay as fast as possible. The DataManager runs on a replay clock that
+    starts at the first recorded event, so every stat it reports during and
+    after the replay is the same on every run at a given speed, and exactly
+    the same at max speed.
+    """
+
+    def __init__(self, columns, speed=1.0, batch_size=INPUT_BATCH_SIZE):
+        self.speed = speed
+        self.batch_size = batch_size
+        self.events = list(zip(columns.timestamps.tolist(),
+                               [ACTION_KINDS[kind] for kind in columns.kinds.tolist()],
+                               columns.keys.tolist()))
+        start = self.events[0][0] if self.events else 0.0
+        self.clock = ManualClock(start) if speed is None else ScaledClock(start, speed)
+        self.data_manager = DataManager(clock=self.clock)
+
+    @classmethod
+    def from_file(cls, filename, speed=1.0, batch_size=INPUT_BATCH_SIZE):
+        return cls(load_columns(filename), speed, batch_size)
+
+    def run(self):
+        start = time.perf_counter()
+        if self.speed is None:
+            self._run_max_speed()
+        else:
+            self._run_paced()
+        wall_seconds = time.perf_counter() - start
+
+        count = len(self.events)
+        session_seconds = self.events[-1][0] - self.events[0][0] if count > 1 else 0.0
+        stats = {
+            'events': count,
+            'speed': self.speed,
+            'wall_seconds': wall_seconds,
+            'session_seconds': session_seconds,
+            'events_per_second': count / wall_seconds if wall_seconds > 0 else 0.0,
+            'achieved_speedup': session_seconds / wall_seconds if wall_seconds > 0 else 0.0,
+        }
+        logging.info(f"Replayed {count} events in {wall_seconds:.3f}s "
+                     f"({stats['achieved_speedup']:.1f}x real time)")
+        return stats
+
+    def _run_max_speed(self):
+        for i in range(0, len(self.events), self.batch_size):
+            batch = self.events[i:i + self.batch_size]
+            self.clock.set(batch[-1][0])
+            self.data_manager.record_actions(batch)
+
+    def _run_paced(self):
+        i = 0
+        count = len(self.events)
+        while i < count:
+            now = self.clock.time()
+            # Record every event that is due, like the input consumer would
+            j = i
+            while j < count and j - i < self.batch_size and self.events[j][0] <= now:
+                j += 1
+            if j > i:
+                self.data_manager.record_actions(self.events[i:j])
+                i = j
+            else:
+                self.clock.sleep(self.events[i][0] - now)
+
+    def close(self):
+        self.data_manager.close()
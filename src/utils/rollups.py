@@ -0,0 +1,200 @@
+import numpy as np
+from utils.constants import (
+    ROLLUP_SECOND_RETENTION, ROLLUP_SECOND_SLACK, ROLLUP_FOLD_SECONDS, ROLLING_HISTOGRAM_REFRESH_SECONDS
+)
+
+class RollupStore:
+    """
+    Per-second and per-minute action totals for long-running sessions.
+
+    Every action is counted into a per-second ring as it is recorded, so
+    per-second data is available for the whole retention period even after
+    the raw events are gone. ``compact`` folds seconds older than the
+    retention into per-minute totals, which are kept for the rest of the
+    session. Each second or minute holds an action count, an effective
+    action count and an eAPM weight sum.
+    """
+
+    def __init__(self, second_retention=ROLLUP_SECOND_RETENTION, slack=ROLLUP_SECOND_SLACK):
+        self.second_retention = second_retention
+        # The slack leaves room for compaction to fall behind without
+        # recording overwriting seconds that have not been folded yet
+        self.size = second_retention + slack
+        self.stamps = np.full(self.size, -1, dtype=np.int64)
+        self.counts = np.zeros(self.size, dtype=np.uint16)
+        self.effective = np.zeros(self.size, dtype=np.uint16)
+        self.weights = np.zeros(self.size, dtype=np.float32)
+
+        # The second being recorded is accumulated in Python and written on change
+        self.current_second = None
+        self.current_count = 0
+        self.current_effective = 0
+        self.current_weight = 0.0
+
+        self.folded_until = None  # Seconds before this live in the minute tier
+        self.first_minute = None
+        self.minute_counts = np.zeros(0, dtype=np.int64)
+        self.minute_effective = np.zeros(0, dtype=np.int64)
+        self.minute_weights = np.zeros(0, dtype=np.float64)
+
+    def add(self, timestamp, weight=0.0):
+        second = int(timestamp)
+        if second != self.current_second:
+            self._flush()
+            if self.folded_until is None:
+                self.folded_until = second - second % 60
+            self.current_second = second
+        self.current_count += 1
+        if weight:
+            self.current_effective += 1
+            self.current_weight += weight
+
+    def _flush(self):
+        second = self.current_second
+        if second is None or not self.current_count:
+            return
+        if second < self.folded_until:
+            # Too late for the second ring, count it in its minute
+            self._add_minutes(np.array([second // 60]), np.array([self.current_count]),
+                              np.array([self.current_effective]), np.array([self.current_weight]))
+        else:
+            index = second % self.size
+            if self.stamps[index] != second:
+                self.stamps[index] = second
+                self.counts[index] = 0
+                self.effective[index] = 0
+                self.weights[index] = 0.0
+            self.counts[index] += self.current_count
+            self.effective[index] += self.current_effective
+            self.weights[index] += self.current_weight
+        self.current_count = 0
+        self.current_effective = 0
+        self.current_weight = 0.0
+
+    def per_second(self, start, end):
+        """(counts, effective counts, weights) for each second in [start, end)."""
+        self._flush()
+        seconds = np.arange(start, end, dtype=np.int64)
+        index = seconds % self.size
+        valid = self.stamps[index] == seconds
+        return (np.where(valid, self.counts[index], 0),
+                np.where(valid, self.effective[index], 0),
+                np.where(valid, self.weights[index], 0.0))
+
+    def range_totals(self, start, end):
+        """
+        (count, effective count, weight) for [start, end) in whole seconds.
+        Ranges reaching past the second retention are answered from the
+        minute tier, to the minute.
+        """
+        self._flush()
+        count = 0
+        effective = 0
+        weight = 0.0
+        if self.folded_until is not None and start < self.folded_until and len(self.minute_counts):
+            first = max(-(-start // 60) - self.first_minute, 0)
+            last = min(self.folded_until, end) // 60 - self.first_minute
+            if last > first:
+                count += int(self.minute_counts[first:last].sum())
+                effective += int(self.minute_effective[first:last].sum())
+                weight += float(self.minute_weights[first:last].sum())
+        if self.folded_until is not None:
+            start = max(start, self.folded_until)
+        if end > start:
+            # Past the ring the seconds have been overwritten or not recorded yet
+            start = max(start, end - self.size)
+            counts, effectives, weights = self.per_second(start, end)
+            count += int(counts.sum())
+            effective += int(effectives.sum())
+            weight += float(weights.sum())
+        return count, effective, weight
+
+    def compact(self, now, max_seconds=ROLLUP_FOLD_SECONDS):
+        """
+        Fold whole minutes older than the second retention into the minute
+        tier, at most ``max_seconds`` per call so each step stays short.
+        Returns the number of seconds folded.
+        """
+        self._flush()
+        if self.folded_until is None:
+            return 0
+        cutoff = int(now) - self.second_retention
+        cutoff -= cutoff % 60
+        # Anything older than the ring has been overwritten, skip straight past it
+        oldest = cutoff - self.size
+        oldest += -oldest % 60
+        start = max(self.folded_until, oldest)
+        stop = min(cutoff, start + max_seconds)
+        if stop <= self.folded_until:
+            return 0
+
+        seconds = np.arange(start, stop, dtype=np.int64)
+        index = seconds % self.size
+        valid = self.stamps[index] == seconds
+        index = index[valid]
+        minutes = seconds[valid] // 60
+        if len(minutes):
+            unique, inverse = np.unique(minutes, return_inverse=True)
+            self._add_minutes(unique,
+                              np.bincount(inverse, weights=self.counts[index]).astype(np.int64),
+                              np.bincount(inverse, weights=self.effective[index]).astype(np.int64),
+                              np.bincount(inverse, weights=self.weights[index]))
+        self.stamps[index] = -1
+        folded = stop - self.folded_until
+        self.folded_until = stop
+        return folded
+
+    def _add_minutes(self, minutes, counts, effective, weights):
+        if self.first_minute is None:
+            self.first_minute = int(minutes[0])
+        if minutes[0] < self.first_minute:
+            shift = self.first_minute - int(minutes[0])
+            self.minute_counts = np.concatenate([np.zeros(shift, dtype=np.int64), self.minute_counts])
+            self.minute_effective = np.concatenate([np.zeros(shift, dtype=np.int64), self.minute_effective])
+            self.minute_weights = np.concatenate([np.zeros(shift), self.minute_weights])
+            self.first_minute -= shift
+        offsets = minutes - self.first_minute
+        needed = int(offsets.max()) + 1
+        if needed > len(self.minute_counts):
+            grow = needed - len(self.minute_counts)
+            self.minute_counts = np.concatenate([self.minute_counts, np.zeros(grow, dtype=np.int64)])
+            self.minute_effective = np.concatenate([self.minute_effective, np.zeros(grow, dtype=np.int64)])
+            self.minute_weights = np.concatenate([self.minute_weights, np.zeros(grow)])
+        np.add.at(self.minute_counts, offsets, counts)
+        np.add.at(self.minute_effective, offsets, effective)
+        np.add.at(self.minute_weights, offsets, weights)
+
+class RollingHistogram:
+    """
+    Per-second action counts and eAPM weights for the last ``seconds``
+    seconds, oldest first. Each update shifts the arrays by the whole
+    seconds elapsed since the previous one and re-reads only the newest
+    seconds from the rollups, so the cost depends on how much time passed
+    and not on the range or the session length. Going back in time or
+    skipping a whole range rebuilds it in one vectorised read.
+    """
+
+    def __init__(self, rollups, seconds, refresh=ROLLING_HISTOGRAM_REFRESH_SECONDS):
+        self.rollups = rollups
+        self.seconds = seconds
+        # Seconds before the newest that are always re-read, for actions recorded late
+        self.refresh = refresh
+        self.end = None
+        self.counts = np.zeros(seconds)
+        self.weights = np.zeros(seconds)
+
+    def update(self, now):
+        end = int(now) + 1
+        elapsed = None if self.end is None else end - self.end
+        if elapsed is None or elapsed < 0 or elapsed >= self.seconds:
+            fresh = self.seconds
+        else:
+            if elapsed:
+                self.counts[:-elapsed] = self.counts[elapsed:]
+                self.weights[:-elapsed] = self.weights[elapsed:]
+            fresh = min(elapsed + 1 + self.refresh, self.seconds)
+        counts, _, weights = self.rollups.per_second(end - fresh, end)
+        self.counts[-fresh:] = counts
+        self.weights[-fresh:] = weights
+        self.end = end
+        return self.counts, self.weights
@@ -0,0 +1,218 @@
+import logging
+import pathlib
+import sqlite3
+import threading
+import numpy as np
+from utils.constants import (
+    ACTION_KINDS, ACTION_CATEGORIES, SESSION_DB_FILE, SESSION_DB_FLUSH_INTERVAL, SESSION_DB_BATCH_ROWS
+)
+from utils.key_codes import UNKNOWN_KEY
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    id INTEGER PRIMARY KEY,
+    started_at REAL NOT NULL,
+    ended_at REAL,
+    target_program TEXT NOT NULL DEFAULT '',
+    actions INTEGER NOT NULL DEFAULT 0,
+    effective_weight REAL NOT NULL DEFAULT 0,
+    peak_apm INTEGER,
+    peak_eapm INTEGER,
+    average_apm REAL,
+    average_eapm REAL
+);
+CREATE INDEX IF NOT EXISTS sessions_started ON sessions (started_at);
+CREATE INDEX IF NOT EXISTS sessions_program_started ON sessions (target_program, started_at);
+
+CREATE TABLE IF NOT EXISTS actions (
+    session_id INTEGER NOT NULL REFERENCES sessions (id),
+    timestamp REAL NOT NULL,
+    kind INTEGER NOT NULL,
+    key INTEGER NOT NULL,  -- 0 unless the session was recorded with store_keys
+    category INTEGER NOT NULL,
+    weight REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS actions_session_time ON actions (session_id, timestamp);
+CREATE INDEX IF NOT EXISTS actions_session_category ON actions (session_id, category);
+
+-- Per-minute totals kept up to date by the writer, for history charts
+CREATE TABLE IF NOT EXISTS session_minutes (
+    session_id INTEGER NOT NULL REFERENCES sessions (id),
+    minute INTEGER NOT NULL,
+    actions INTEGER NOT NULL,
+    weight REAL NOT NULL,
+    PRIMARY KEY (session_id, minute)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS kinds (id INTEGER PRIMARY KEY, name TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS categories (id INTEGER PRIMARY KEY, name TEXT NOT NULL);
+"""
+
+class SessionCatalog:
+    """
+    SQLite database of recorded sessions in WAL mode. Writes go through one
+    connection guarded by a lock; queries use a separate read-only
+    connection, so they never wait behind a batch insert.
+
+    Actions are stored with their kind and eAPM category only. The key
+    itself is saved only when ``store_keys`` is set, since a log of every
+    key pressed in every window is a keylogger.
+    """
+
+    def __init__(self, path=SESSION_DB_FILE, store_keys=False):
+        self.path = path
+        self.store_keys = store_keys
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.execute('PRAGMA journal_mode=WAL')
+        self.connection.execute('PRAGMA synchronous=NORMAL')
+        with self.connection:
+            self.connection.executescript(SCHEMA)
+            self.connection.executemany('INSERT OR REPLACE INTO kinds VALUES (?, ?)', enumerate(ACTION_KINDS))
+            self.connection.executemany('INSERT OR REPLACE INTO categories VALUES (?, ?)', enumerate(ACTION_CATEGORIES))
+        self.read_lock = threading.Lock()
+        self.reader = sqlite3.connect(pathlib.Path(path).absolute().as_uri() + '?mode=ro', uri=True,
+                                      check_same_thread=False)
+
+    def begin_session(self, started_at, target_program=''):
+        with self.lock, self.connection:
+            cursor = self.connection.execute(
+                'INSERT INTO sessions (started_at, target_program) VALUES (?, ?)', (started_at, target_program))
+        return cursor.lastrowid
+
+    def insert_actions(self, session_id, columns):
+        """Insert a block of store columns and fold it into the minute totals, in one transaction."""
+        count = len(columns.timestamps)
+        if not count:
+            return
+        keys = columns.keys.tolist() if self.store_keys else [UNKNOWN_KEY] * count
+        rows = zip([session_id] * count, columns.timestamps.tolist(), columns.kinds.tolist(),
+                   keys, columns.categories.tolist(), columns.weights.tolist())
+
+        minutes = (columns.timestamps // 60).astype(np.int64)
+        unique_minutes, index, minute_counts = np.unique(minutes, return_inverse=True, return_counts=True)
+        minute_weights = np.bincount(index, weights=columns.weights, minlength=len(unique_minutes))
+        minute_rows = zip([session_id] * len(unique_minutes), unique_minutes.tolist(),
+                          minute_counts.tolist(), minute_weights.tolist())
+
+        with self.lock, self.connection:
+            self.connection.executemany('INSERT INTO actions VALUES (?, ?, ?, ?, ?, ?)', rows)
+            self.connection.executemany(
+                'INSERT INTO session_minutes VALUES (?, ?, ?, ?) '
+                'ON CONFLICT (session_id, minute) DO UPDATE SET '
+                'actions = actions + excluded.actions, weight = weight + excluded.weight',
+                minute_rows)
+
+    def end_session(self, session_id, summary):
+        with self.lock, self.connection:
+            self.connection.execute(
+                'UPDATE sessions SET ended_at = :ended_at, target_program = :target_program, '
+                'actions = :actions, effective_weight = :effective_weight, '
+                'peak_apm = :peak_apm, peak_eapm = :peak_eapm, '
+                'average_apm = :average_apm, average_eapm = :average_eapm WHERE id = :id',
+                dict(summary, id=session_id))
+
+    def sessions(self, target_program=None, since=None, limit=100):
+        """Newest sessions first, as dicts."""
+        query = 'SELECT * FROM sessions WHERE 1'
+        params = []
+        if target_program is not None:
+            query += ' AND target_program = ?'
+            params.append(target_program)
+        if since is not None:
+            query += ' AND started_at >= ?'
+            params.append(since)
+        query += ' ORDER BY started_at DESC LIMIT ?'
+        params.append(limit)
+        return self._query(query, params)
+
+    def best_peak_eapm(self, target_program=None, since=None):
+        """The finished session with the highest peak eAPM, or None."""
+        query = 'SELECT * FROM sessions WHERE peak_eapm IS NOT NULL'
+        params = []
+        if target_program is not None:
+            query += ' AND target_program = ?'
+            params.append(target_program)
+        if since is not None:
+            query += ' AND started_at >= ?'
+            params.append(since)
+        query += ' ORDER BY peak_eapm DESC LIMIT 1'
+        rows = self._query(query, params)
+        return rows[0] if rows else None
+
+    def apm_per_minute(self, session_id):
+        """(minute start timestamp, actions, effective weight) for each minute with actions."""
+        with self.read_lock:
+            return self.reader.execute(
+                'SELECT minute * 60, actions, weight FROM session_minutes '
+                'WHERE session_id = ? ORDER BY minute', (session_id,)).fetchall()
+
+    def _query(self, query, params):
+        with self.read_lock:
+            cursor = self.reader.execute(query, params)
+            names = [column[0] for column in cursor.description]
+            return [dict(zip(names, row)) for row in cursor.fetchall()]
+
+    def close(self):
+        with self.read_lock:
+            self.reader.close()
+        with self.lock:
+            self.connection.close()
+
+class CatalogWriter:
+    """
+    Background thread that copies new rows from a DataManager's event store
+    into the catalog. It remembers the global row index it has written up
+    to, so each poll only holds the DataManager lock long enough to copy the
+    rows added since, and the inserts happen outside it.
+    """
+
+    def __init__(self, catalog, data_manager, target_program='',
+                 interval=SESSION_DB_FLUSH_INTERVAL, batch_rows=SESSION_DB_BATCH_ROWS):
+        self.catalog = catalog
+        self.data_manager = data_manager
+        self.interval = interval
+        self.batch_rows = batch_rows
+        self.next_row = 0
+        self.target_program = target_program
+        self.session_id = catalog.begin_session(data_manager.start_time, target_program)
+        self.stop_event = threading.Event()
+        self.thread = threading.Thread(target=self.run, name='CatalogWriter', daemon=True)
+
+    def start(self):
+        self.thread.start()
+        logging.info(f"Recording session {self.session_id} to {self.catalog.path}")
+
+    def run(self):
+        while not self.stop_event.wait(self.interval):
+            try:
+                self.flush()
+            except Exception as e:
+                logging.error(f"Error writing to session catalog: {e}")
+
+    def flush(self):
+        while True:
+            with self.data_manager.lock:
+                store = self.data_manager.store
+                if self.next_row < store.first_row:
+                    logging.warning(f"Session catalog fell behind, {store.first_row - self.next_row} actions were not saved")
+                    self.next_row = store.first_row
+                columns = store.rows_from(self.next_row, self.batch_rows)
+            count = len(columns.timestamps)
+            if not count:
+                return
+            self.catalog.insert_actions(self.session_id, columns)
+            self.next_row += count
+
+    def stop(self, target_program=None):
+        """Write any remaining rows and the session summary."""
+        self.stop_event.set()
+        if self.thread.is_alive():
+            self.thread.join()
+        try:
+            self.flush()
+            summary = self.data_manager.session_summary()
+            summary['target_program'] = self.target_program if target_program is None else target_program
+            self.catalog.end_session(self.session_id, summary)
+        except Exception as e:
+            logging.error(f"Error finishing session {self.session_id} in catalog: {e}")
@@ -0,0 +1,130 @@
+import logging
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from utils.eapm_rules import EMPTY_CLASS
+from utils.constants import ACTION_KINDS, ACTION_CATEGORIES, APM_WINDOW_SECONDS
+
+MOUSE_KIND = ACTION_KINDS.index('mouse_click')
+
+class SessionRescorer:
+    """
+    Recompute eAPM for a recorded session under different weights and
+    cooldowns without replaying input.
+
+    Rule matching does not depend on the weights or cooldowns, so it is done
+    once for the whole session with vectorized table lookups. Each scoring
+    config then only needs the cooldown pass, which is inherently sequential
+    (an action's eligibility depends on the last effective one) and runs as a
+    single loop over the candidate actions, followed by NumPy reductions for
+    the totals, category breakdown and peaks.
+    """
+
+    def __init__(self, columns, eapm_rules):
+        self.timestamps = np.asarray(columns.timestamps, dtype=np.float64)
+        self.sequence_categories, self.action_categories = classify(columns, eapm_rules)
+
+    def score(self, config):
+        return score_session(self.timestamps, self.sequence_categories, self.action_categories, config)
+
+    def sweep(self, configs, processes=None):
+        """Score many configs across a process pool, results in config order."""
+        configs = list(configs)
+        if processes == 1 or len(configs) <= 1:
+            return [self.score(config) for config in configs]
+        with ProcessPoolExecutor(max_workers=processes, initializer=_init_worker,
+                                 initargs=(self.timestamps, self.sequence_categories,
+                                           self.action_categories)) as executor:
+            return list(executor.map(_score_in_worker, configs))
+
+def classify(columns, eapm_rules):
+    """Vectorized equivalent of EapmRules.push over a whole session."""
+    n = eapm_rules.class_count
+    class_by_code = np.asarray(eapm_rules.class_by_code, dtype=np.int64)
+    classes = np.where(np.asarray(columns.kinds) == MOUSE_KIND, eapm_rules.mouse_class,
+                       class_by_code[np.asarray(columns.keys, dtype=np.int64)])
+
+    last = np.empty_like(classes)
+    second_last = np.empty_like(classes)
+    last[:1] = EMPTY_CLASS
+    last[1:] = classes[:-1]
+    second_last[:2] = EMPTY_CLASS
+    second_last[2:] = classes[:-2]
+
+    sequence_table = np.asarray(eapm_rules.sequence_table, dtype=np.uint8)
+    action_table = np.asarray(eapm_rules.action_table, dtype=np.uint8)
+    return sequence_table[(second_last * n + last) * n + classes], action_table[classes]
+
+def apply_cooldowns(timestamps, sequence_categories, action_categories, action_cooldown, sequence_cooldown):
+    """Final category per action after the cooldowns, 0 where not effective."""
+    categories = np.zeros(len(timestamps), dtype=np.uint8)
+    candidates = np.flatnonzero((sequence_categories > 0) | (action_categories > 0))
+    last_effective = 0.0
+    for i, t, sequence, action in zip(candidates.tolist(), timestamps[candidates].tolist(),
+                                      sequence_categories[candidates].tolist(),
+                                      action_categories[candidates].tolist()):
+        elapsed = t - last_effective
+        if elapsed < action_cooldown:
+            continue
+        category = sequence if sequence and elapsed >= sequence_cooldown else action
+        if category:
+            categories[i] = category
+            last_effective = t
+    return categories
+
+def trailing_window_peak(seconds, values, window=APM_WINDOW_SECONDS):
+    """Largest sum over ``window`` consecutive per-second buckets."""
+    if len(seconds) == 0:
+        return 0.0
+    totals = np.bincount(seconds, weights=values)
+    cumulative = np.concatenate(([0.0], np.cumsum(totals)))
+    window = min(window, len(totals))
+    sums = cumulative[window:] - cumulative[:-window]
+    # Windows that start before the first second are partial sums
+    return float(max(sums.max(), cumulative[1:window].max(initial=0.0)))
+
+def score_session(timestamps, sequence_categories, action_categories, config):
+    categories = apply_cooldowns(timestamps, sequence_categories, action_categories,
+                                 config['action_cooldown'], config['sequence_cooldown'])
+    weight_table = np.zeros(len(ACTION_CATEGORIES), dtype=np.float64)
+    action_weights = config['action_weights']
+    for i, name in enumerate(ACTION_CATEGORIES[1:], start=1):
+        weight_table[i] = action_weights.get(name, action_weights['default'])
+    weights = weight_table[categories]
+
+    count = len(timestamps)
+    duration = float(timestamps[-1] - timestamps[0]) / 60 if count > 1 else 0.0
+    total_weight = float(weights.sum())
+
+    seconds = np.floor(timestamps).astype(np.int64)
+    if count:
+        seconds -= seconds[0]
+    category_counts = np.bincount(categories, minlength=len(ACTION_CATEGORIES))
+    category_weights = np.bincount(categories, weights=weights, minlength=len(ACTION_CATEGORIES))
+
+    return {
+        'config': config,
+        'actions': count,
+        'effective_actions': int(np.count_nonzero(categories)),
+        'total_eapm_weight': total_weight,
+        'average_apm': count / duration if duration > 0 else 0,
+        'average_eapm': total_weight / duration if duration > 0 else 0,
+        'peak_apm': int(trailing_window_peak(seconds, np.ones(count))),
+        'peak_eapm': round(trailing_window_peak(seconds, weights)),
+        'categories': {
+            name: {'count': int(category_counts[i]), 'weight': float(category_weights[i])}
+            for i, name in enumerate(ACTION_CATEGORIES) if i and category_counts[i]
+        },
+    }
+
+_worker_session = None
+
+def _init_worker(timestamps, sequence_categories, action_categories):
+    global _worker_session
+    _worker_session = (timestamps, sequence_categories, action_categories)
+
+def _score_in_worker(config):
+    try:
+        return score_session(*_worker_session, config)
+    except Exception as e:
+        logging.error(f"Error scoring config {config}: {e}")
+        raise
@@ -4,7 +4,9 @@ from utils.window_utils import update_window_list
 from utils.constants import (
     DEFAULT_TRANSPARENCY, DEFAULT_UPDATE_INTERVAL, DEFAULT_GRAPH_UPDATE_INTERVAL,
     DEFAULT_GRAPH_TIME_RANGE, DEFAULT_MAX_ACTIONS_PER_SECOND,
-    DEFAULT_ACTION_COOLDOWN, DEFAULT_EAPM_COOLDOWN, GRAPH_TIME_RANGE_OPTIONS
+    DEFAULT_ACTION_COOLDOWN, DEFAULT_EAPM_COOLDOWN, GRAPH_TIME_RANGE_OPTIONS,
+    DEFAULT_APM_WINDOWS, MAX_APM_WINDOW, DEFAULT_OVERLAY_PORT, DEFAULT_OVERLAY_PUSH_RATE,
+    MAX_OVERLAY_PUSH_RATE, DEFAULT_METRICS_PORT, GRAPH_BACKEND_OPTIONS, DEFAULT_GRAPH_BACKEND
 )
 
 class SettingsManager:
@@ -12,6 +14,7 @@ class SettingsManager:
         self.target_program = ""
         self.transparency = DEFAULT_TRANSPARENCY
         self.window_list = []
+        self.window_list_loaded = False  # Filled on first use, scanning processes is slow
         self.log_level = logging.INFO
         self.update_interval = DEFAULT_UPDATE_INTERVAL
         self.graph_update_interval = DEFAULT_GRAPH_UPDATE_INTERVAL
@@ -20,7 +23,19 @@ class SettingsManager:
         self.action_cooldown = DEFAULT_ACTION_COOLDOWN
         self.eapm_cooldown = DEFAULT_EAPM_COOLDOWN
         self.graph_time_range_options = GRAPH_TIME_RANGE_OPTIONS
-        self.update_window_list()
+        self.graph_backend = DEFAULT_GRAPH_BACKEND
+        self.graph_backend_options = GRAPH_BACKEND_OPTIONS
+        self.apm_windows = list(DEFAULT_APM_WINDOWS)
+        self.mini_window_show_windows = False
+        self.session_history = False
+        self.session_history_keys = False  # also save which key was pressed
+        self.average_window = 0  # minutes, 0 averages over the whole session
+        self.overlay_server = False
+        self.overlay_port = DEFAULT_OVERLAY_PORT
+        self.overlay_push_rate = DEFAULT_OVERLAY_PUSH_RATE
+        self.shared_stats = False
+        self.metrics_server = False
+        self.metrics_port = DEFAULT_METRICS_PORT
 
     def save_settings(self):
         settings = {
@@ -30,9 +45,21 @@ class SettingsManager:
             'update_interval': self.update_interval,
             'graph_update_interval': self.graph_update_interval,
             'graph_time_range': self.graph_time_range,
+            'graph_backend': self.graph_backend,
             'max_actions_per_second': self.max_actions_per_second,
             'action_cooldown': self.action_cooldown,
-            'eapm_cooldown': self.eapm_cooldown
+            'eapm_cooldown': self.eapm_cooldown,
+            'apm_windows': self.apm_windows,
+            'mini_window_show_windows': self.mini_window_show_windows,
+            'session_history': self.session_history,
+            'session_history_keys': self.session_history_keys,
+            'average_window': self.average_window,
+            'overlay_server': self.overlay_server,
+            'overlay_port': self.overlay_port,
+            'overlay_push_rate': self.overlay_push_rate,
+            'shared_stats': self.shared_stats,
+            'metrics_server': self.metrics_server,
+            'metrics_port': self.metrics_port
         }
         try:
             with open('settings.yaml', 'w') as f:
@@ -51,9 +78,21 @@ class SettingsManager:
                 self.update_interval = settings.get('update_interval', DEFAULT_UPDATE_INTERVAL)
                 self.graph_update_interval = settings.get('graph_update_interval', DEFAULT_GRAPH_UPDATE_INTERVAL)
                 self.graph_time_range = settings.get('graph_time_range', DEFAULT_GRAPH_TIME_RANGE)
+                self.graph_backend = settings.get('graph_backend', DEFAULT_GRAPH_BACKEND)
                 self.max_actions_per_second = settings.get('max_actions_per_second', DEFAULT_MAX_ACTIONS_PER_SECOND)
                 self.action_cooldown = settings.get('action_cooldown', DEFAULT_ACTION_COOLDOWN)
                 self.eapm_cooldown = settings.get('eapm_cooldown', DEFAULT_EAPM_COOLDOWN)
+                self.apm_windows = settings.get('apm_windows', list(DEFAULT_APM_WINDOWS))
+                self.mini_window_show_windows = settings.get('mini_window_show_windows', False)
+                self.session_history = settings.get('session_history', False)
+                self.session_history_keys = settings.get('session_history_keys', False)
+                self.average_window = settings.get('average_window', 0)
+                self.overlay_server = settings.get('overlay_server', False)
+                self.overlay_port = settings.get('overlay_port', DEFAULT_OVERLAY_PORT)
+                self.overlay_push_rate = settings.get('overlay_push_rate', DEFAULT_OVERLAY_PUSH_RATE)
+                self.shared_stats = settings.get('shared_stats', False)
+                self.metrics_server = settings.get('metrics_server', False)
+                self.metrics_port = settings.get('metrics_port', DEFAULT_METRICS_PORT)
             logging.info("Settings loaded successfully")
         except FileNotFoundError:
             logging.info("Settings file not found. Using defaults.")
@@ -78,6 +117,7 @@ class SettingsManager:
     def update_window_list(self):
         try:
             self.window_list = update_window_list()
+            self.window_list_loaded = True
             logging.info(f"Window list updated. {len(self.window_list)} windows found.")
         except Exception as e:
             logging.error(f"Failed to update window list: {str(e)}")
@@ -109,6 +149,9 @@ class SettingsManager:
         if self.graph_time_range < 10 or self.graph_time_range > 300:
             logging.warning("Invalid graph time range. Setting to 60 seconds.")
             self.graph_time_range = 60
+        if self.graph_backend not in GRAPH_BACKEND_OPTIONS:
+            logging.warning(f"Unknown graph renderer. Setting to {DEFAULT_GRAPH_BACKEND}.")
+            self.graph_backend = DEFAULT_GRAPH_BACKEND
         if self.max_actions_per_second < 1:
             logging.warning("Invalid max actions per second. Setting to 1.")
             self.max_actions_per_second = 1
@@ -118,6 +161,22 @@ class SettingsManager:
         if self.eapm_cooldown < 0.01 or self.eapm_cooldown > 2:
             logging.warning("Invalid eAPM cooldown. Setting to 0.5 seconds.")
             self.eapm_cooldown = 0.5
+        if not self.apm_windows or any(w < 1 or w > MAX_APM_WINDOW for w in self.apm_windows):
+            logging.warning(f"Invalid APM windows. Windows must be 1 to {MAX_APM_WINDOW} seconds.")
+            self.apm_windows = list(DEFAULT_APM_WINDOWS)
+
+        if self.average_window < 0:
+            logging.warning("Invalid average window. Using the whole session.")
+            self.average_window = 0
+        if self.overlay_port < 1 or self.overlay_port > 65535:
+            logging.warning(f"Invalid overlay port. Setting to {DEFAULT_OVERLAY_PORT}.")
+            self.overlay_port = DEFAULT_OVERLAY_PORT
+        if self.overlay_push_rate <= 0 or self.overlay_push_rate > MAX_OVERLAY_PUSH_RATE:
+            logging.warning(f"Invalid overlay update rate. Setting to {DEFAULT_OVERLAY_PUSH_RATE} per second.")
+            self.overlay_push_rate = DEFAULT_OVERLAY_PUSH_RATE
+        if self.metrics_port < 1 or self.metrics_port > 65535:
+            logging.warning(f"Invalid metrics port. Setting to {DEFAULT_METRICS_PORT}.")
+            self.metrics_port = DEFAULT_METRICS_PORT
 
     def get_settings_dict(self):
         return {
@@ -127,9 +186,21 @@ class SettingsManager:
             'update_interval': self.update_interval,
             'graph_update_interval': self.graph_update_interval,
             'graph_time_range': self.graph_time_range,
+            'graph_backend': self.graph_backend,
             'max_actions_per_second': self.max_actions_per_second,
             'action_cooldown': self.action_cooldown,
-            'eapm_cooldown': self.eapm_cooldown
+            'eapm_cooldown': self.eapm_cooldown,
+            'apm_windows': self.apm_windows,
+            'mini_window_show_windows': self.mini_window_show_windows,
+            'session_history': self.session_history,
+            'session_history_keys': self.session_history_keys,
+            'average_window': self.average_window,
+            'overlay_server': self.overlay_server,
+            'overlay_port': self.overlay_port,
+            'overlay_push_rate': self.overlay_push_rate,
+            'shared_stats': self.shared_stats,
+            'metrics_server': self.metrics_server,
+            'metrics_port': self.metrics_port
         }
     
     def set_graph_time_range(self, index):
@@ -0,0 +1,203 @@
+import logging
+import threading
+import time
+from multiprocessing import shared_memory
+import numpy as np
+from utils.constants import (
+    SHARED_STATS_NAME, SHARED_STATS_INTERVAL, SHARED_STATS_HISTOGRAM_SECONDS, SHARED_STATS_LIVENESS_INTERVALS
+)
+
+# Fixed little-endian layout of the shared region. The sequence counter is
+# odd while the publisher is writing and even when the payload is stable.
+SHARED_STATS_MAGIC = b'APMS'
+SHARED_STATS_VERSION = 1
+
+HEADER_DTYPE = np.dtype([
+    ('magic', 'S4'),
+    ('version', '<u4'),
+    ('sequence', '<u8'),
+])
+
+PAYLOAD_DTYPE = np.dtype([
+    ('timestamp', '<f8'),
+    ('session_seconds', '<f8'),
+    ('current_apm', '<f8'),
+    ('current_eapm', '<f8'),
+    ('peak_apm', '<f8'),
+    ('peak_eapm', '<f8'),
+    ('average_apm', '<f8'),
+    ('average_eapm', '<f8'),
+    ('total_actions', '<u8'),
+    ('histogram_end', '<i8'),  # The histogram covers the seconds before this one, oldest first
+    ('histogram_counts', '<u4', (SHARED_STATS_HISTOGRAM_SECONDS,)),
+    ('histogram_weights', '<f4', (SHARED_STATS_HISTOGRAM_SECONDS,)),
+])
+
+PAYLOAD_OFFSET = HEADER_DTYPE.itemsize
+SHARED_STATS_SIZE = PAYLOAD_OFFSET + PAYLOAD_DTYPE.itemsize
+
+class StatsPublisher:
+    """
+    Background thread that writes a DataManager's live stats into a named
+    shared memory block every ``interval`` seconds, for readers in other
+    processes (see StatsReader). Each write bumps the sequence counter to
+    odd, fills in the payload and bumps it back to even.
+    """
+
+    def __init__(self, data_manager, name=SHARED_STATS_NAME, interval=SHARED_STATS_INTERVAL):
+        self.data_manager = data_manager
+        self.interval = interval
+        try:
+            self.memory = shared_memory.SharedMemory(name, create=True, size=SHARED_STATS_SIZE)
+        except FileExistsError:
+            self.remove_stale_block(name)
+            self.memory = shared_memory.SharedMemory(name, create=True, size=SHARED_STATS_SIZE)
+        self.header = np.ndarray((), dtype=HEADER_DTYPE, buffer=self.memory.buf)
+        self.payload = np.ndarray((), dtype=PAYLOAD_DTYPE, buffer=self.memory.buf, offset=PAYLOAD_OFFSET)
+        self.header['magic'] = SHARED_STATS_MAGIC
+        self.header['version'] = SHARED_STATS_VERSION
+        self.sequence = 0
+        self.stop_event = threading.Event()
+        self.thread = threading.Thread(target=self.run, name='StatsPublisher', daemon=True)
+
+    @property
+    def name(self):
+        return self.memory.name
+
+    def remove_stale_block(self, name):
+        """
+        Unlink a block left behind by a tracker that did not shut down
+        cleanly. Raises FileExistsError instead when the block is not
+        ours, or when its sequence still moves because another tracker
+        is publishing to it.
+        """
+        existing = attach_shared_memory(name)
+        try:
+            if existing.size < SHARED_STATS_SIZE:
+                raise FileExistsError(f"Shared memory '{name}' exists and does not hold APM Tracker stats")
+            header = np.ndarray((), dtype=HEADER_DTYPE, buffer=existing.buf)
+            if bytes(header['magic']) != SHARED_STATS_MAGIC:
+                del header
+                raise FileExistsError(f"Shared memory '{name}' exists and does not hold APM Tracker stats")
+            sequence = int(header['sequence'])
+            time.sleep(self.interval * SHARED_STATS_LIVENESS_INTERVALS)
+            live = int(header['sequence']) != sequence
+            del header  # Views must go before the buffer can close
+            if live:
+                raise FileExistsError(f"Another tracker is publishing stats to shared memory '{name}'")
+        finally:
+            existing.close()
+        # Opened again the usual way, so the unlink is paired with this
+        # process's resource tracker registration
+        logging.info(f"Removing stale shared memory '{name}'")
+        stale = shared_memory.SharedMemory(name)
+        stale.close()
+        stale.unlink()
+
+    def start(self):
+        self.publish()
+        self.thread.start()
+        logging.info(f"Publishing stats to shared memory '{self.name}'")
+
+    def run(self):
+        while not self.stop_event.wait(self.interval):
+            try:
+                self.publish()
+            except Exception as e:
+                logging.error(f"Error publishing shared stats: {e}")
+
+    def publish(self):
+        data_manager = self.data_manager
+        now = data_manager.current_time()
+        end = int(now) + 1
+        with data_manager.lock:
+            counts, _, weights = data_manager.rollups.per_second(end - SHARED_STATS_HISTOGRAM_SECONDS, end)
+        values = (
+            now,
+            now - data_manager.start_time,
+            data_manager.calculate_current_apm(),
+            data_manager.calculate_current_eapm(),
+            data_manager.peak_apm,
+            data_manager.peak_eapm,
+            data_manager.calculate_average_apm(),
+            data_manager.calculate_average_eapm(),
+            data_manager.total_actions,
+            end,
+            counts,
+            weights,
+        )
+
+        # Everything is computed first so the odd window is just the copy
+        self.sequence += 1
+        self.header['sequence'] = self.sequence
+        self.payload[()] = values
+        self.sequence += 1
+        self.header['sequence'] = self.sequence
+
+    def stop(self):
+        self.stop_event.set()
+        if self.thread.is_alive():
+            self.thread.join()
+        self.header = self.payload = None  # Views must go before the buffer can close
+        self.memory.close()
+        self.memory.unlink()
+
+class StatsReader:
+    """
+    Reads the stats published by a running tracker from another process.
+
+        reader = StatsReader()
+        stats = reader.read()
+        stats['current_apm'], stats['histogram_counts']
+
+    ``read`` retries while the publisher is mid-write, so every snapshot is
+    consistent. ``sequence`` is a single 8-byte load, so a fast poller can
+    check it and only call ``read`` when it has changed.
+    """
+
+    def __init__(self, name=SHARED_STATS_NAME):
+        self.memory = attach_shared_memory(name)
+        self.buffer = self.memory.buf
+        self.header = np.ndarray((), dtype=HEADER_DTYPE, buffer=self.buffer)
+        if bytes(self.header['magic']) != SHARED_STATS_MAGIC or self.header['version'] != SHARED_STATS_VERSION:
+            self.close()
+            raise ValueError(f"Shared memory '{name}' does not hold APM Tracker stats version {SHARED_STATS_VERSION}")
+
+    def sequence(self):
+        return int(self.header['sequence'])
+
+    def read(self, timeout=1.0):
+        """Consistent stats as a dict, with the histogram as numpy arrays."""
+        deadline = None
+        while True:
+            before = int(self.header['sequence'])
+            if not before & 1:
+                data = bytes(self.buffer[PAYLOAD_OFFSET:SHARED_STATS_SIZE])
+                if int(self.header['sequence']) == before:
+                    stats = dict(zip(PAYLOAD_DTYPE.names, np.frombuffer(data, dtype=PAYLOAD_DTYPE)[0].item()))
+                    stats['sequence'] = before
+                    return stats
+            if deadline is None:
+                deadline = time.monotonic() + timeout
+            elif time.monotonic() > deadline:
+                raise TimeoutError("Shared stats stayed mid-update, is the publisher stuck?")
+
+    def close(self):
+        self.header = None
+        self.buffer = None
+        self.memory.close()
+
+def attach_shared_memory(name):
+    """Open an existing block without this process taking ownership of it."""
+    try:
+        return shared_memory.SharedMemory(name, track=False)
+    except TypeError:
+        # Before Python 3.13 attaching registers the block with the resource
+        # tracker, which would unlink it when this reader exits
+        memory = shared_memory.SharedMemory(name)
+        try:
+            from multiprocessing import resource_tracker
+            resource_tracker.unregister(memory._name, 'shared_memory')
+        except Exception:
+            pass
+        return memory
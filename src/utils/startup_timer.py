@@ -0,0 +1,36 @@
+import logging
+import time
+
+class StartupTimer:
+    """
+    Time spent in each startup phase, reported once the main window has
+    painted. The report also says how long the process had been running,
+    which includes interpreter start-up and, for the PyInstaller binary,
+    unpacking.
+    """
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.last = self.start
+        self.phases = []
+
+    def mark(self, phase):
+        now = time.perf_counter()
+        self.phases.append((phase, now - self.last))
+        self.last = now
+
+    def process_age(self):
+        try:
+            import psutil
+            return time.time() - psutil.Process().create_time()
+        except Exception:
+            return None
+
+    def report(self):
+        phases = ", ".join(f"{phase} {seconds * 1000:.0f}ms" for phase, seconds in self.phases)
+        message = f"Startup took {(self.last - self.start) * 1000:.0f}ms ({phases})"
+        age = self.process_age()
+        if age is not None:
+            message += f", {age * 1000:.0f}ms since process start"
+        logging.info(message)
+        return message
@@ -1,6 +1,5 @@
 import platform
 import logging
-import psutil
 
 if platform.system() == 'Windows':
     try:
@@ -11,6 +10,7 @@ if platform.system() == 'Windows':
         logging.error("Failed to import Windows-specific modules. Make sure pywin32 is installed.")
 
 def update_window_list():
+    import psutil  # Only needed here, keep it out of startup
     window_list = []
     try:
         if platform.system() == 'Windows':